@@ -0,0 +1,5 @@
+"""Betaflight MSP / CRSF tools.
+
+Importing the package is cheap: submodules and pyserial are only loaded
+when used, and no serial port is opened until a request is sent.
+"""
@@ -0,0 +1,74 @@
+"""Bulk decode of recorded MSP_STATUS flag words.
+
+Every function takes parallel arrays of timestamps (seconds) and flag words
+and works column-wise with numpy, so the cost per sample is a few vector ops
+regardless of how many modes are decoded. A sample's state is assumed to hold
+until the next sample's timestamp.
+"""
+import numpy as np
+
+from .status import FLIGHT_MODE_FLAGS
+
+# Причины запрета арминга (armingDisableFlags, Betaflight 4.3+; порядок зависит от прошивки)
+ARMING_DISABLE_FLAGS = tuple(enumerate((
+    "NO_GYRO", "FAILSAFE", "RX_FAILSAFE", "BAD_RX_RECOVERY", "BOXFAILSAFE",
+    "RUNAWAY_TAKEOFF", "CRASH_DETECTED", "THROTTLE", "ANGLE", "BOOT_GRACE_TIME",
+    "NOPREARM", "LOAD", "CALIBRATING", "CLI", "CMS_MENU", "BST", "MSP", "PARALYZE",
+    "GPS", "RESC", "RPMFILTER", "REBOOT_REQUIRED", "DSHOT_BITBANG", "ACC_CALIBRATION",
+    "MOTOR_PROTOCOL", "ARM_SWITCH",
+)))
+
+
+def decode_bits(flags, table=FLIGHT_MODE_FLAGS) -> np.ndarray:
+    """Boolean matrix (samples x table entries) of the bits named in ``table``."""
+    flags = np.asarray(flags, dtype=np.uint32)
+    bits = np.array([bit for bit, _ in table], dtype=np.uint32)
+    return ((flags[:, None] >> bits) & 1).astype(bool)
+
+
+def _durations(timestamps) -> np.ndarray:
+    t = np.asarray(timestamps, dtype=float)
+    d = np.empty_like(t)
+    d[:-1] = np.diff(t)
+    d[-1:] = 0.0
+    return d
+
+
+def intervals(timestamps, active) -> np.ndarray:
+    """(start, end) rows for each run of True in ``active``."""
+    t = np.asarray(timestamps, dtype=float)
+    a = np.asarray(active, dtype=np.int8)
+    if not len(a):
+        return np.empty((0, 2))
+    edges = np.diff(np.concatenate(([0], a, [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    # Конец интервала — время первого сэмпла без режима (или последнего сэмпла)
+    end_times = t[np.minimum(ends, len(t) - 1)]
+    return np.column_stack((t[starts], end_times))
+
+
+def summarize(timestamps, flags, table=FLIGHT_MODE_FLAGS) -> dict:
+    """Per-name intervals, transition count and total active time."""
+    bits = decode_bits(flags, table)
+    if not len(bits):
+        return {name: {'intervals': np.empty((0, 2)), 'transitions': 0, 'time': 0.0}
+                for _, name in table}
+    durations = _durations(timestamps)
+    transitions = np.count_nonzero(np.diff(bits, axis=0), axis=0)
+    totals = durations @ bits
+    return {
+        name: {
+            'intervals': intervals(timestamps, bits[:, i]),
+            'transitions': int(transitions[i]),
+            'time': float(totals[i]),
+        }
+        for i, (_, name) in enumerate(table)
+    }
+
+
+def arming_disable_summary(timestamps, arming_disable_flags) -> dict:
+    """Total time each arming-disable reason was present, longest first."""
+    stats = summarize(timestamps, arming_disable_flags, ARMING_DISABLE_FLAGS)
+    return dict(sorted(((name, s) for name, s in stats.items() if s['time'] > 0 or len(s['intervals'])),
+                       key=lambda item: -item[1]['time']))
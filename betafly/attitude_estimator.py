@@ -0,0 +1,100 @@
+import math
+import threading
+import time
+from typing import Optional, Tuple
+
+
+def wrap180(angle: float) -> float:
+    """Wrap an angle in degrees to [-180, 180)."""
+    return (angle + 180.0) % 360.0 - 180.0
+
+
+class AttitudeEstimator:
+    """Host-side attitude between MSP_ATTITUDE polls.
+
+    Gyro rates from MSP_RAW_IMU are integrated through the Euler kinematic
+    equations; every fresh MSP_ATTITUDE sample pulls the estimate back with a
+    complementary update and slowly trims the gyro bias. ``get()`` extrapolates
+    to any timestamp without touching the serial port.
+    """
+
+    def __init__(self, gain: float = 0.7, bias_gain: float = 0.02,
+                 gyro_scale: float = 1.0, axis_signs=(1, 1, 1)):
+        self.gain = gain              # доля ошибки, исправляемая за один MSP_ATTITUDE
+        self.bias_gain = bias_gain    # скорость подстройки смещения гироскопа
+        self.gyro_scale = gyro_scale  # отсчёты MSP_RAW_IMU -> град/с (Betaflight: 1.0)
+        self.axis_signs = axis_signs
+        self.lock = threading.Lock()
+        self.angles = [0.0, 0.0, 0.0]   # roll, pitch, yaw, градусы
+        self.rates = [0.0, 0.0, 0.0]    # скорости углов Эйлера, град/с
+        self.bias = [0.0, 0.0, 0.0]     # смещение гироскопа, град/с
+        self.body = (0.0, 0.0, 0.0)     # последние угловые скорости корпуса
+        self.timestamp: Optional[float] = None
+        self.last_fix: Optional[float] = None
+        self.initialized = False
+
+    def _euler_rates(self, roll: float, pitch: float, p: float, q: float, r: float):
+        phi = math.radians(roll)
+        theta = math.radians(max(-89.0, min(89.0, pitch)))
+        sp, cp = math.sin(phi), math.cos(phi)
+        tt, ct = math.tan(theta), math.cos(theta)
+        return (p + (sp * q + cp * r) * tt,
+                cp * q - sp * r,
+                (sp * q + cp * r) / ct)
+
+    def _advance(self, t: float):
+        if self.timestamp is None:
+            self.timestamp = t
+            return
+        dt = t - self.timestamp
+        if dt <= 0:
+            return
+        for i in range(3):
+            self.angles[i] += self.rates[i] * dt
+        self.angles[0] = wrap180(self.angles[0])
+        self.angles[2] %= 360.0
+        self.timestamp = t
+
+    def update_gyro(self, gyro, t: Optional[float] = None):
+        """Feed raw (gx, gy, gz) from MSP_RAW_IMU."""
+        t = time.monotonic() if t is None else t
+        with self.lock:
+            self._advance(t)
+            p, q, r = (g * self.gyro_scale * s - b
+                       for g, s, b in zip(gyro, self.axis_signs, self.bias))
+            self.body = (p, q, r)
+            self.rates = list(self._euler_rates(self.angles[0], self.angles[1], p, q, r))
+
+    def update_attitude(self, attitude, t: Optional[float] = None):
+        """Feed (roll, pitch, yaw) in degrees from MSP_ATTITUDE."""
+        t = time.monotonic() if t is None else t
+        with self.lock:
+            if not self.initialized:
+                self.angles = [float(a) for a in attitude]
+                self.timestamp = t
+                self.last_fix = t
+                self.initialized = True
+                return
+            self._advance(t)
+            dt = t - self.last_fix if self.last_fix is not None else 0.0
+            for i in range(3):
+                error = wrap180(attitude[i] - self.angles[i])
+                self.angles[i] += self.gain * error
+                if dt > 0:
+                    # ошибка, накопленная за dt, — след остаточного смещения гироскопа
+                    self.bias[i] -= self.bias_gain * error / dt
+            self.angles[0] = wrap180(self.angles[0])
+            self.angles[2] %= 360.0
+            self.last_fix = t
+
+    def get(self, t: Optional[float] = None) -> Optional[Tuple[float, float, float, float]]:
+        """Return (roll, pitch, yaw, timestamp) extrapolated to ``t``."""
+        t = time.monotonic() if t is None else t
+        with self.lock:
+            if not self.initialized:
+                return None
+            dt = max(0.0, t - self.timestamp)
+            roll = wrap180(self.angles[0] + self.rates[0] * dt)
+            pitch = self.angles[1] + self.rates[1] * dt
+            yaw = (self.angles[2] + self.rates[2] * dt) % 360.0
+            return roll, pitch, yaw, t
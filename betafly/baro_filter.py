@@ -0,0 +1,94 @@
+import time
+from typing import Optional, Tuple
+
+
+class AltitudeFilter:
+    """Constant-velocity Kalman filter for MSP_ALTITUDE.
+
+    State is altitude (m) and vertical speed (m/s). Each ``update`` is O(1)
+    and uses the real time between samples, so it works with an irregular or
+    slow (10 Hz) poll. MSP_ALTITUDE also carries the FC's own vertical speed
+    estimate (vario); when given it is fused as a second, speed-only
+    observation with noise ``vario_var``.
+    """
+
+    def __init__(self, accel_noise: float = 2.0, baro_var: float = 0.09,
+                 vario_var: float = 0.25, initial_var: float = 10.0):
+        self.q = accel_noise * accel_noise  # (м/с²)² — манёвренность по вертикали
+        self.baro_var = baro_var            # м² — шум барометра
+        self.vario_var = vario_var          # (м/с)² — шум vario контроллера
+        self.initial_var = initial_var
+        self.reset()
+
+    def reset(self):
+        self.altitude = 0.0
+        self.speed = 0.0
+        self.p00 = self.p01 = self.p11 = 0.0
+        self.timestamp: Optional[float] = None
+
+    def update(self, altitude: float, vario: Optional[float] = None,
+               t: Optional[float] = None) -> Tuple[float, float]:
+        """Feed altitude (m) and optionally vario (m/s); returns filtered (altitude, vertical speed)."""
+        t = time.monotonic() if t is None else t
+        r = self.baro_var
+        if self.timestamp is None:
+            self.altitude, self.speed = altitude, 0.0 if vario is None else vario
+            self.p00, self.p01, self.p11 = r, 0.0, self.initial_var
+            self.timestamp = t
+            return self.altitude, self.speed
+
+        dt = t - self.timestamp
+        self.timestamp = t
+        if dt > 0:
+            # Прогноз
+            self.altitude += self.speed * dt
+            dt2 = dt * dt
+            q = self.q
+            self.p00 += dt * (2 * self.p01 + dt * self.p11) + q * dt2 * dt2 / 4
+            self.p01 += dt * self.p11 + q * dt2 * dt / 2
+            self.p11 += q * dt2
+
+        # Коррекция
+        s = self.p00 + r
+        k0 = self.p00 / s
+        k1 = self.p01 / s
+        y = altitude - self.altitude
+        self.altitude += k0 * y
+        self.speed += k1 * y
+        self.p11 -= k1 * self.p01
+        self.p01 -= k0 * self.p01
+        self.p00 -= k0 * self.p00
+
+        if vario is not None:
+            # Коррекция по vario: наблюдаем только скорость
+            s = self.p11 + self.vario_var
+            k0 = self.p01 / s
+            k1 = self.p11 / s
+            y = vario - self.speed
+            self.altitude += k0 * y
+            self.speed += k1 * y
+            self.p00 -= k0 * self.p01
+            self.p01 -= k0 * self.p11
+            self.p11 -= k1 * self.p11
+        return self.altitude, self.speed
+
+
+def filter_altitude(timestamps, altitudes, varios=None, **kwargs):
+    """Run AltitudeFilter over recorded arrays (altitude in m, vario in m/s).
+
+    Returns numpy arrays (altitude, vertical speed) aligned with the input.
+    The recursion is inherently sequential, so the arrays are walked once as
+    plain floats with the same O(1) update used on the live stream.
+    """
+    import numpy as np
+
+    t = np.asarray(timestamps, dtype=float)
+    z = np.asarray(altitudes, dtype=float)
+    v = [None] * len(z) if varios is None else np.asarray(varios, dtype=float).tolist()
+    f = AltitudeFilter(**kwargs)
+    update = f.update
+    out = [update(zi, vi, ti) for ti, zi, vi in zip(t.tolist(), z.tolist(), v)]
+    if not out:
+        return np.empty(0), np.empty(0)
+    out = np.array(out)
+    return out[:, 0], out[:, 1]
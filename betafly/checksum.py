@@ -0,0 +1,232 @@
+"""Checksums shared by the CRSF and MSP code: CRC8 DVB-S2 and MSP v1 XOR.
+
+* ``crc8_dvb_s2`` / ``xor8`` take an optional starting value, so a frame can
+  be checked as it streams in; ``CRC8DVBS2`` and ``MSPChecksum`` wrap that
+  as running objects.
+* Short frames use a table loop over a Python list (the fastest pure-Python
+  form). Long buffers switch backends: XOR folds the whole buffer as one
+  big integer, CRC8 splits it into equal chunks, runs them column by column
+  in numpy and combines the partial CRCs (CRC is linear, so appending ``m``
+  bytes maps the running value through a fixed 256-entry table).
+* ``crc8_dvb_s2_many`` / ``xor8_many`` check many frames of a capture in
+  one pass, and ``validate_crsf`` / ``validate_msp`` split a raw capture
+  into frames and check them all.
+
+numpy is only needed for long buffers and the bulk functions.
+"""
+from functools import lru_cache
+from math import isqrt
+from typing import Iterable, Tuple
+
+CRC8_DVB_S2_POLY = 0xD5
+# Ниже этих длин выгоднее обычный цикл по таблице
+XOR_FOLD_THRESHOLD = 64
+CRC_CHUNKED_THRESHOLD = 4096
+
+
+def _crc8_table(poly: int):
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = ((crc << 1) ^ poly) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        table.append(crc)
+    return table
+
+
+CRC8_DVB_S2_TABLE = _crc8_table(CRC8_DVB_S2_POLY)
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    return np
+
+
+# ====== Одиночные буферы ======
+
+def crc8_dvb_s2(data, crc: int = 0) -> int:
+    """CRC8 DVB-S2 of ``data``, continuing from ``crc``."""
+    if len(data) >= CRC_CHUNKED_THRESHOLD:
+        np = _numpy()
+        if np is not None:
+            return _crc8_chunked(np, data, crc)
+    table = CRC8_DVB_S2_TABLE
+    for byte in data:
+        crc = table[crc ^ byte]
+    return crc
+
+
+def xor8(data, crc: int = 0) -> int:
+    """MSP v1 checksum (XOR of all bytes) of ``data``, continuing from ``crc``."""
+    n = len(data)
+    if n < XOR_FOLD_THRESHOLD:
+        for byte in data:
+            crc ^= byte
+        return crc
+    # Складываем число пополам, пока не останется один байт
+    value = int.from_bytes(data, 'little')
+    width = 8 << (n - 1).bit_length()
+    while width > 8:
+        width >>= 1
+        value = (value >> width) ^ (value & ((1 << width) - 1))
+    return crc ^ value
+
+
+@lru_cache(maxsize=16)
+def _zeros_table(m: int):
+    """Maps a running CRC to its value after ``m`` more zero bytes."""
+    import numpy as np
+
+    table = np.array(CRC8_DVB_S2_TABLE, dtype=np.uint8)
+    shift = np.arange(256, dtype=np.uint8)
+    for _ in range(m):
+        shift = table[shift]
+    return shift.tolist()
+
+
+def _crc8_chunked(np, data, crc: int) -> int:
+    buf = np.frombuffer(data, dtype=np.uint8)
+    m = max(64, isqrt(len(buf)))
+    k = len(buf) // m
+    table = np.array(CRC8_DVB_S2_TABLE, dtype=np.uint8)
+    columns = np.ascontiguousarray(buf[:k * m].reshape(k, m).T)
+    partial = np.zeros(k, dtype=np.uint8)
+    partial[0] = crc
+    for column in columns:
+        partial = table[partial ^ column]
+    # crc(A + B) = zeros_m(crc(A)) ^ crc(B) при нулевом начальном значении B
+    shift = _zeros_table(m)
+    crc = 0
+    for value in partial.tolist():
+        crc = shift[crc] ^ value
+    table = CRC8_DVB_S2_TABLE
+    for byte in buf[k * m:].tobytes():
+        crc = table[crc ^ byte]
+    return crc
+
+
+class CRC8DVBS2:
+    """Running CRC8 DVB-S2: ``update()`` as bytes arrive, read ``value``."""
+
+    def __init__(self, crc: int = 0):
+        self.value = crc
+
+    def update(self, data) -> 'CRC8DVBS2':
+        self.value = crc8_dvb_s2(data, self.value)
+        return self
+
+
+class MSPChecksum:
+    """Running MSP v1 XOR checksum."""
+
+    def __init__(self, crc: int = 0):
+        self.value = crc
+
+    def update(self, data) -> 'MSPChecksum':
+        self.value = xor8(data, self.value)
+        return self
+
+
+# ====== Пакетная проверка ======
+
+def _columns(np, buffer, offsets, lengths, step):
+    """Run ``step(values, column)`` over many spans at once, one byte column per step."""
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    # Длинные кадры вперёд: активные на шаге j — всегда префикс
+    order = np.argsort(-lengths, kind='stable')
+    offs, lens = offsets[order], lengths[order]
+    values = np.zeros(len(offs), dtype=np.uint8)
+    active = len(offs)
+    for j in range(int(lens[0]) if len(lens) else 0):
+        while active and lens[active - 1] <= j:
+            active -= 1
+        values[:active] = step(values[:active], data[offs[:active] + j])
+    result = np.empty_like(values)
+    result[order] = values
+    return result
+
+
+def crc8_dvb_s2_many(buffer, offsets: Iterable[int], lengths: Iterable[int]):
+    """CRC8 DVB-S2 of ``buffer[offset:offset + length]`` for every span (numpy array)."""
+    import numpy as np
+
+    table = np.array(CRC8_DVB_S2_TABLE, dtype=np.uint8)
+    return _columns(np, buffer, offsets, lengths, lambda crc, column: table[crc ^ column])
+
+
+def xor8_many(buffer, offsets: Iterable[int], lengths: Iterable[int]):
+    """MSP XOR checksum of every span (numpy array)."""
+    import numpy as np
+
+    return _columns(np, buffer, offsets, lengths, np.bitwise_xor)
+
+
+def split_crsf(buffer, sync_bytes=(0xC8, 0xEA, 0xEE), max_length: int = 64) -> Tuple[list, list]:
+    """Offsets and length bytes of CRSF frames in a raw capture (no CRC check)."""
+    offsets, lengths = [], []
+    i, end = 0, len(buffer)
+    while i + 2 <= end:
+        length = buffer[i + 1]
+        if buffer[i] not in sync_bytes or not 2 <= length <= max_length:
+            i += 1
+            continue
+        if i + 2 + length > end:
+            break
+        offsets.append(i)
+        lengths.append(length)
+        i += 2 + length
+    return offsets, lengths
+
+
+def validate_crsf(buffer, sync_bytes=(0xC8, 0xEA, 0xEE)):
+    """Split a CRSF capture and check every frame: (offsets, crc_ok) numpy arrays."""
+    import numpy as np
+
+    offsets, lengths = split_crsf(buffer, sync_bytes)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    # CRC покрывает тип и payload: от offset + 2 до байта CRC
+    crc = crc8_dvb_s2_many(buffer, offsets + 2, lengths - 1)
+    received = np.frombuffer(buffer, dtype=np.uint8)[offsets + lengths + 1]
+    return offsets, crc == received
+
+
+def split_msp(buffer, jumbo_size: int = 255) -> Tuple[list, list]:
+    """Offsets and checksummed span lengths of MSP v1 frames in a bytes capture."""
+    offsets, spans = [], []
+    end = len(buffer)
+    i = buffer.find(b'$M')
+    while 0 <= i and i + 5 <= end:
+        if buffer[i + 2] not in b'<>!':
+            i = buffer.find(b'$M', i + 1)
+            continue
+        size = buffer[i + 3]
+        span = 2 + size
+        if size == jumbo_size:
+            if i + 7 > end:
+                break
+            span = 4 + (buffer[i + 5] | buffer[i + 6] << 8)
+        if i + 4 + span > end:
+            break
+        offsets.append(i)
+        spans.append(span)
+        i = buffer.find(b'$M', i + 4 + span)
+    return offsets, spans
+
+
+def validate_msp(buffer):
+    """Split an MSP capture and check every frame: (offsets, checksum_ok) numpy arrays."""
+    import numpy as np
+
+    offsets, spans = split_msp(buffer)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    spans = np.asarray(spans, dtype=np.int64)
+    # Контрольная сумма покрывает size, command (и jumbo-длину) с payload
+    chk = xor8_many(buffer, offsets + 3, spans)
+    received = np.frombuffer(buffer, dtype=np.uint8)[offsets + 3 + spans]
+    return offsets, chk == received
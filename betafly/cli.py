@@ -0,0 +1,356 @@
+import argparse
+import sys
+
+from .msp import BAUD_RATE, SERIAL_PORT
+
+# Модули подкоманд импортируются внутри обработчиков: старт CLI не тянет
+# pyserial и не открывает порт, пока команда его не запросит.
+
+
+def _client(args, timeout=0.1):
+    if args.via_crsf:
+        from .crsf import AlfredoCRSF, CRSFMSPClient
+
+        crsf = AlfredoCRSF(args.port, args.baud or 420000, low_latency=args.low_latency)
+        return CRSFMSPClient(crsf, timeout=max(timeout, 0.5))
+
+    from .msp import MSPClient
+
+    return MSPClient(args.port, args.baud or BAUD_RATE, timeout=timeout, low_latency=args.low_latency)
+
+
+def cmd_status(args):
+    from .status import get_arm_status, get_flight_mode, print_baro_altitude
+
+    with _client(args, timeout=1) as client:
+        print(f"Arm status: {get_arm_status(client)}")
+        get_flight_mode(client)
+        print_baro_altitude(client)
+
+
+def cmd_modes(args):
+    from .status import print_active_modes
+
+    with _client(args, timeout=1) as client:
+        client.ser.reset_input_buffer()
+        print("Connection established. Reading modes...")
+        print_active_modes(client)
+
+
+def cmd_monitor(args):
+    from .sensors import monitor
+
+    with _client(args) as client:
+        kwargs = dict(freq=args.freq, attitude_only=args.attitude_only,
+                      profile=args.profile, metrics_port=args.metrics_port,
+                      estimate_rate=args.estimate_rate, metrics_file=args.metrics_file)
+        if args.imu_cal:
+            from .imu import ImuCalibration
+
+            kwargs['calibration'] = ImuCalibration.load(args.imu_cal)
+        if args.plot:
+            from .plotter import LivePlotter
+
+            plotter = LivePlotter(fps=args.fps)
+            plotter.run_with(monitor, client, plotter=plotter, **kwargs)
+        else:
+            monitor(client, **kwargs)
+    print("Соединение закрыто")
+
+
+def cmd_arm(args):
+    import time
+
+    from .status import arm_disarm, get_arm_status, set_arm, set_throttle
+
+    def switch(client, arm):
+        if args.rc:
+            set_arm(client, arm)
+        else:
+            print(f"Sending {'ARM' if arm else 'DISARM'} command...")
+            if not arm_disarm(client, arm, timeout=args.timeout):
+                print(f"FC did not report {'ARMED' if arm else 'DISARMED'} within {args.timeout:.2f}s")
+
+    with _client(args, timeout=1) as client:
+        print(f"Initial status: {get_arm_status(client)}")
+        if not args.cycle:
+            switch(client, not args.disarm)
+            print(f"Status: {get_arm_status(client)}")
+            return
+        # Цикл: арм -> статус -> (газ) -> дизарм; дизарм выполняется в любом случае
+        try:
+            switch(client, True)
+            print(f"Status after ARM: {get_arm_status(client)}")
+            if args.throttle:
+                set_throttle(client, args.throttle)
+                time.sleep(args.hold)
+                set_throttle(client, 1000)
+        except KeyboardInterrupt:
+            print("\nПрервано")
+        finally:
+            switch(client, False)
+            print(f"Final status: {get_arm_status(client)}")
+
+
+def cmd_baro(args):
+    from .status import print_baro_altitude
+
+    with _client(args, timeout=1) as client:
+        print_baro_altitude(client)
+
+
+def cmd_imu_record(args):
+    import time
+
+    from .imu import ImuBuffer
+    from .msp import MSP_RAW_IMU
+
+    period = 1.0 / args.freq
+    buf = ImuBuffer(int(args.seconds * args.freq) + 1)
+    with _client(args) as client:
+        print(f"Запись RAW_IMU {args.seconds:.0f} с...")
+        end = time.monotonic() + args.seconds
+        try:
+            while time.monotonic() < end:
+                start = time.monotonic()
+                buf.append_payload(start, client.request(MSP_RAW_IMU))
+                time.sleep(max(0.0, period - (time.monotonic() - start)))
+        except KeyboardInterrupt:
+            print("\nОстановка")
+    buf.save(args.output)
+    print(f"Сохранено сэмплов: {len(buf)} -> {args.output}")
+
+
+def cmd_imu_calibrate(args):
+    from . import imu
+
+    cal = imu.ImuCalibration.load(args.base) if args.base else imu.ImuCalibration()
+    if args.gyro:
+        cal['gyro'] = imu.fit_gyro_bias(imu.load_recording(args.gyro)[1][:, 3:6])
+        print(f"gyro bias: {cal['gyro'].bias.round(3).tolist()} град/с")
+    if args.acc:
+        cal['acc'] = imu.fit_accel_six_position([imu.load_recording(p)[1][:, 0:3] for p in args.acc])
+        print(f"acc bias: {cal['acc'].bias.round(4).tolist()} g")
+    if args.mag:
+        cal['mag'] = imu.fit_mag_hard_soft_iron(imu.load_recording(args.mag)[1][:, 6:9])
+        print(f"mag hard iron: {cal['mag'].bias.round(1).tolist()}")
+    cal.save(args.output)
+    print(f"Калибровка -> {args.output}")
+
+
+def cmd_crsf(args):
+    from .crsf import monitor
+
+    if args.plot:
+        from .plotter import LivePlotter
+
+        plotter = LivePlotter(fps=args.fps)
+        plotter.run_with(monitor, args.port, args.baud or 420000,
+                         low_latency=args.low_latency, plotter=plotter)
+    else:
+        monitor(args.port, args.baud or 420000, low_latency=args.low_latency)
+
+
+def cmd_crsf_tx(args):
+    import time
+
+    from .crsf_encoder import CRSFSender, us_to_crsf
+
+    baudrate = args.baud or 420000
+    if args.low_latency:
+        from .lowlatency import LowLatencySerial
+
+        ser = LowLatencySerial(args.port, baudrate)
+    else:
+        import serial
+
+        ser = serial.serial_for_url(args.port, baudrate, timeout=0)
+    # Незаданные каналы — центр, газ (канал 3) — минимум
+    channels = [1500] * 16
+    channels[2] = 988
+    channels[:len(args.channels)] = args.channels
+    raw = [us_to_crsf(us) for us in channels]
+    sender = CRSFSender(ser, args.rate, lambda: raw).start()
+    try:
+        while True:
+            time.sleep(1)
+            stats = sender.jitter_stats()
+            if stats['frames']:
+                print(f"кадров: {stats['frames']}, опоздание p50 {stats['p50'] * 1e6:.0f} мкс, "
+                      f"p99 {stats['p99'] * 1e6:.0f} мкс, max {stats['max'] * 1e6:.0f} мкс")
+    except KeyboardInterrupt:
+        print("\nОстановка")
+    finally:
+        sender.stop()
+        ser.close()
+
+
+def cmd_pipeline(args):
+    import time
+
+    from . import pipeline
+    from .msp import MSP_ALTITUDE, MSP_ATTITUDE, MSP_RAW_IMU
+
+    handlers = [pipeline.print_frame]
+    if args.log:
+        handlers.append(pipeline.FrameLogger(args.log))
+    if args.crsf:
+        source, source_args = pipeline.crsf_reader, (args.port, args.baud or 420000)
+    else:
+        source = pipeline.msp_reader
+        source_args = (args.port, args.baud or BAUD_RATE, (MSP_ATTITUDE, MSP_ALTITUDE, MSP_RAW_IMU), args.freq)
+    with pipeline.Pipeline(source, source_args, handlers):
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print("\nОстановка")
+
+
+def cmd_dataflash(args):
+    from .dataflash import DataflashDownloader
+
+    with _client(args, timeout=0.5) as client:
+        ok = DataflashDownloader(client, args.output, chunk_size=args.chunk,
+                                 in_flight=args.in_flight).run()
+    raise SystemExit(0 if ok else 1)
+
+
+def cmd_snapshot(args):
+    from .settings import Snapshot
+
+    with _client(args, timeout=0.2) as client:
+        snap = Snapshot.fetch(client, args.only)
+    snap.save(args.output)
+    print(f"Сохранено сообщений: {len(snap.messages)} -> {args.output}")
+
+
+def cmd_diff(args):
+    from .settings import Snapshot, diff
+
+    target = Snapshot.load(args.target)
+    if args.current == '-':
+        with _client(args, timeout=0.2) as client:
+            current = Snapshot.fetch(client, list(target.messages))
+    else:
+        current = Snapshot.load(args.current)
+    changes = diff(current, target)
+    for name, fields in changes.items():
+        for field, (old, new) in fields.items():
+            print(f"{name}.{field}: {old} -> {new}")
+    if not changes:
+        print("Различий нет")
+
+
+def cmd_restore(args):
+    from .settings import Snapshot, restore
+
+    target = Snapshot.load(args.snapshot)
+    with _client(args, timeout=0.2) as client:
+        try:
+            sent = restore(client, target, save=not args.no_save, force=args.force)
+        except ValueError as e:
+            print(f"[Ошибка] {e}")
+            raise SystemExit(1)
+    print(f"Отправлено сообщений: {sent}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='betafly', description='Betaflight MSP / CRSF tools')
+    parser.add_argument('--port', default=SERIAL_PORT, help=f'serial port (default {SERIAL_PORT})')
+    parser.add_argument('--baud', type=int, default=None, help=f'baud rate (MSP default {BAUD_RATE})')
+    parser.add_argument('--low-latency', action='store_true',
+                        help='Linux only: raw termios transport with ASYNC_LOW_LATENCY')
+    parser.add_argument('--via-crsf', action='store_true',
+                        help='tunnel MSP through a CRSF link (MSP_REQ/MSP_RESP frames)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('status', help='arm status, flight modes and baro').set_defaults(func=cmd_status)
+    sub.add_parser('baro', help='baro altitude and vertical speed').set_defaults(func=cmd_baro)
+    sub.add_parser('modes', help='active modes by box name').set_defaults(func=cmd_modes)
+
+    p = sub.add_parser('monitor', help='poll attitude/baro/gyro')
+    p.add_argument('--freq', type=float, default=50.0, help='poll rate, Hz')
+    p.add_argument('--attitude-only', action='store_true', help='poll MSP_ATTITUDE only')
+    p.add_argument('--profile', action='store_true', help='print per-phase cycle timings')
+    p.add_argument('--metrics-port', type=int, default=None, help='serve Prometheus /metrics on localhost')
+    p.add_argument('--metrics-file', metavar='PATH',
+                   help='rewrite Prometheus metrics to this file (node_exporter textfile collector)')
+    p.add_argument('--plot', action='store_true', help='live plot (needs matplotlib)')
+    p.add_argument('--fps', type=float, default=20.0, help='plot redraw cap')
+    p.add_argument('--estimate-rate', type=float, default=0.0, metavar='HZ',
+                   help='print/plot the extrapolated attitude at this rate between polls')
+    p.add_argument('--imu-cal', help='IMU calibration JSON: print acc/gyro/mag in physical units')
+    p.set_defaults(func=cmd_monitor)
+
+    p = sub.add_parser('arm', help='arm (or disarm) and report status')
+    p.add_argument('--disarm', action='store_true')
+    p.add_argument('--rc', action='store_true', help='use AUX1 via MSP_SET_RAW_RC instead of MSP_SET_ARMING')
+    p.add_argument('--timeout', type=float, default=0.5, help='seconds to wait for the state change')
+    p.add_argument('--cycle', action='store_true', help='arm, report status, then always disarm')
+    p.add_argument('--throttle', type=int, default=None, help='with --cycle: throttle (1000-2000 us) while armed')
+    p.add_argument('--hold', type=float, default=3.0, help='with --throttle: seconds to hold it')
+    p.set_defaults(func=cmd_arm)
+
+    p = sub.add_parser('imu-record', help='record raw MSP_RAW_IMU to .npz for calibration')
+    p.add_argument('output')
+    p.add_argument('--seconds', type=float, default=10.0)
+    p.add_argument('--freq', type=float, default=100.0, help='poll rate, Hz')
+    p.set_defaults(func=cmd_imu_record)
+
+    p = sub.add_parser('imu-calibrate', help='fit IMU calibration from imu-record files')
+    p.add_argument('output', help='calibration JSON')
+    p.add_argument('--gyro', metavar='NPZ', help='recording with the craft still')
+    p.add_argument('--acc', metavar='NPZ', nargs=6, help='six static positions (each axis up and down)')
+    p.add_argument('--mag', metavar='NPZ', help='recording while rotating through all orientations')
+    p.add_argument('--base', help='start from this calibration instead of defaults')
+    p.set_defaults(func=cmd_imu_calibrate)
+
+    p = sub.add_parser('crsf', help='print CRSF RC channels')
+    p.add_argument('--plot', action='store_true', help='live plot of all 16 channels (needs matplotlib)')
+    p.add_argument('--fps', type=float, default=20.0, help='plot redraw cap')
+    p.set_defaults(func=cmd_crsf)
+
+    p = sub.add_parser('crsf-tx', help='send RC channels at a fixed rate (emulate a TX module)')
+    p.add_argument('--rate', type=float, default=500.0, help='frames per second')
+    p.add_argument('--channels', type=int, nargs='+', default=[], metavar='US',
+                   help='channel values in microseconds, from CH1 (rest: 1500, throttle 988)')
+    p.set_defaults(func=cmd_crsf_tx)
+
+    p = sub.add_parser('pipeline', help='reader process + decoder/logger workers over shared memory')
+    p.add_argument('--crsf', action='store_true', help='read CRSF frames instead of polling MSP')
+    p.add_argument('--freq', type=float, default=50.0, help='MSP poll rate, Hz')
+    p.add_argument('--log', help='append raw frames to this file')
+    p.set_defaults(func=cmd_pipeline)
+
+    p = sub.add_parser('dataflash', help='download blackbox dataflash (resumable)')
+    p.add_argument('output', help='output file; <output>.progress tracks resume state')
+    p.add_argument('--chunk', type=int, default=4096, help='requested bytes per read (FC may return fewer)')
+    p.add_argument('--in-flight', type=int, default=4, help='reads kept in flight')
+    p.set_defaults(func=cmd_dataflash)
+
+    p = sub.add_parser('snapshot', help='save FC settings (PIDs, rates, modes, rx, features)')
+    p.add_argument('output', help='.json for readable JSON, anything else for compact binary')
+    p.add_argument('--only', nargs='+', help='subset of settings by name')
+    p.set_defaults(func=cmd_snapshot)
+
+    p = sub.add_parser('diff', help='field-level diff between snapshots')
+    p.add_argument('current', help="snapshot file, or '-' for the connected FC")
+    p.add_argument('target')
+    p.set_defaults(func=cmd_diff)
+
+    p = sub.add_parser('restore', help='push only changed settings from a snapshot')
+    p.add_argument('snapshot')
+    p.add_argument('--no-save', action='store_true', help='skip MSP_EEPROM_WRITE')
+    p.add_argument('--force', action='store_true', help='restore even if the MSP API versions differ')
+    p.set_defaults(func=cmd_restore)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, 'low_latency', False) and not sys.platform.startswith('linux'):
+        # lowlatency.py построен на termios/fcntl: на Windows (COM-порты) его нет
+        print(f"[Ошибка] --low-latency работает только в Linux (текущая платформа: {sys.platform})")
+        raise SystemExit(1)
+    args.func(args)
@@ -0,0 +1,335 @@
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+
+from .checksum import CRC8_DVB_S2_TABLE, crc8_dvb_s2, xor8
+from .metrics import REGISTRY
+
+# CRSF Protocol Constants
+CRSF_ADDRESS_CRSF_RECEIVER = 0xEE
+CRSF_ADDRESS_FLIGHT_CONTROLLER = 0xC8
+CRSF_ADDRESS_RADIO_TRANSMITTER = 0xEA
+CRSF_FRAMETYPE_RC_CHANNELS_PACKED = 0x16
+CRSF_FRAMETYPE_LINK_STATISTICS = 0x14
+CRSF_FRAMETYPE_MSP_REQ = 0x7A
+CRSF_FRAMETYPE_MSP_RESP = 0x7B
+CRSF_MAX_PACKET_SIZE = 64
+CRSF_MAX_CHANNELS = 16
+CRSF_FRAME_HEADER_BYTES = 2
+CRSF_FRAME_CRC_BYTES = 1
+
+# MSP поверх CRSF: байт статуса перед каждым куском MSP-кадра
+CRSF_MSP_SEQ_MASK = 0x0F
+CRSF_MSP_START_FLAG = 0x10
+CRSF_MSP_VERSION_SHIFT = 5
+CRSF_MSP_ERROR_FLAG = 0x80
+CRSF_MSP_REQ_CHUNK = 8  # байт на кадр MSP_REQ вместе со статусом (Betaflight RX_MSP_FRAME_SIZE)
+
+
+class CRC8:
+    """CRC8 calculation class."""
+
+    def __init__(self):
+        self.crc8_dvb_s2_table = CRC8_DVB_S2_TABLE
+
+    def calculate(self, data: bytes) -> int:
+        return crc8_dvb_s2(data)
+
+
+class MedianFilter:
+    """Median filter for smoothing channel data."""
+
+    def __init__(self, window_size: int):
+        self.window_size = window_size
+        self.values = deque(maxlen=window_size)
+
+    def update(self, value: float) -> float:
+        self.values.append(value)
+        if len(self.values) < self.window_size:
+            return value
+        sorted_values = sorted(self.values)
+        mid = len(sorted_values) // 2
+        if len(sorted_values) % 2 == 0:
+            return (sorted_values[mid - 1] + sorted_values[mid]) / 2
+        return sorted_values[mid]
+
+
+class AlfredoCRSF:
+    """Python implementation of Alfredo CRSF library."""
+
+    def __init__(self, port: str, baudrate: int = 420000, timeout: float = 0.1,
+                 low_latency: bool = False):
+        if low_latency:
+            if not sys.platform.startswith('linux'):
+                raise RuntimeError("low_latency: LowLatencySerial работает только в Linux (termios)")
+            from .lowlatency import LowLatencySerial
+
+            self.serial = LowLatencySerial(port, baudrate, timeout=timeout)
+        else:
+            import serial  # pyserial грузим только при создании соединения
+
+            self.serial = serial.Serial(port, baudrate, timeout=timeout)
+        self.crc8 = CRC8()
+        self.channels = [1500] * CRSF_MAX_CHANNELS
+        self.median_filters = [MedianFilter(3) for _ in range(CRSF_MAX_CHANNELS)]
+        self.buffer = bytearray()
+        self.last_packet_time = time.time()
+        self.metrics = REGISTRY.link('crsf')
+        self.sync_bytes = {CRSF_ADDRESS_FLIGHT_CONTROLLER}
+        self.msp_seq = 0
+        self.msp_rx = None  # [cmd, size, bytearray, next_seq] собираемого ответа
+        self.msp_responses = deque()
+
+    def begin(self):
+        """Initialize serial communication."""
+        if not self.serial.is_open:
+            self.serial.open()
+
+    def read_frames(self) -> List[bytes]:
+        """Read available bytes and return complete, CRC-valid frames."""
+        frames = []
+        if not self.serial.is_open:
+            return frames
+
+        # Read available bytes
+        while self.serial.in_waiting > 0:
+            self.buffer.extend(self.serial.read(self.serial.in_waiting))
+
+            # Process packets
+            while len(self.buffer) >= CRSF_FRAME_HEADER_BYTES:
+                # Check for valid packet start
+                if self.buffer[0] not in self.sync_bytes:
+                    self.metrics.header_error()
+                    self.buffer.pop(0)
+                    continue
+
+                packet_length = self.buffer[1]
+                if packet_length < 2 or packet_length > CRSF_MAX_PACKET_SIZE:
+                    self.metrics.header_error()
+                    self.buffer.pop(0)
+                    continue
+
+                if len(self.buffer) < packet_length + CRSF_FRAME_HEADER_BYTES:
+                    break  # Wait for more data
+
+                # Extract packet
+                packet = bytes(self.buffer[:packet_length + CRSF_FRAME_HEADER_BYTES])
+                del self.buffer[:packet_length + CRSF_FRAME_HEADER_BYTES]
+
+                # Verify CRC
+                crc_received = packet[-1]
+                crc_calculated = crc8_dvb_s2(packet[2:-1])
+                if crc_received != crc_calculated:
+                    self.metrics.checksum_error()
+                    continue
+                self.metrics.frame_received(packet[2], len(packet))
+                frames.append(packet)
+
+        return frames
+
+    def read(self) -> bool:
+        """Read and process incoming CRSF packets."""
+        got_channels = False
+        for packet in self.read_frames():
+            if packet[2] == CRSF_FRAMETYPE_RC_CHANNELS_PACKED:
+                self._parse_channels(packet[3:-1])
+                self.last_packet_time = time.time()
+                got_channels = True
+            elif packet[2] == CRSF_FRAMETYPE_MSP_RESP:
+                self._handle_msp_response(packet)
+            # Add handling for other packet types (e.g., link statistics) if needed
+        return got_channels
+
+    def write_frame(self, frame_type: int, payload: bytes, dest: Optional[int] = None,
+                    origin: Optional[int] = None):
+        """Send a frame; ``dest``/``origin`` make it an extended-header frame."""
+        body = bytes((frame_type,))
+        if dest is not None:
+            body += bytes((dest, origin))
+        body += payload
+        frame = bytes((CRSF_ADDRESS_FLIGHT_CONTROLLER, len(body) + CRSF_FRAME_CRC_BYTES)) + body \
+            + bytes((crc8_dvb_s2(body),))
+        self.serial.write(frame)
+        self.metrics.frame_sent(frame_type, len(frame))
+
+    def send_msp(self, command: int, data: bytes = b''):
+        """Send an MSP v1 request split into MSP_REQ frames."""
+        msp = bytes((len(data), command)) + data
+        msp += bytes((xor8(msp),))
+        step = CRSF_MSP_REQ_CHUNK - 1
+        for offset in range(0, len(msp), step):
+            status = self.msp_seq | (1 << CRSF_MSP_VERSION_SHIFT)
+            if offset == 0:
+                status |= CRSF_MSP_START_FLAG
+            self.msp_seq = (self.msp_seq + 1) & CRSF_MSP_SEQ_MASK
+            self.write_frame(CRSF_FRAMETYPE_MSP_REQ, bytes((status,)) + msp[offset:offset + step],
+                             CRSF_ADDRESS_FLIGHT_CONTROLLER, CRSF_ADDRESS_RADIO_TRANSMITTER)
+
+    def _handle_msp_response(self, packet: bytes):
+        """Reassemble chunked MSP_RESP frames into ``msp_responses``."""
+        # sync, len, type, dest, origin, status, data..., crc
+        if len(packet) < 7:
+            return
+        status = packet[5]
+        data = packet[6:-1]
+        seq = status & CRSF_MSP_SEQ_MASK
+        if status & CRSF_MSP_ERROR_FLAG:
+            cmd = self.msp_rx[0] if self.msp_rx else (data[1] if len(data) > 1 else None)
+            self.msp_rx = None
+            self.msp_responses.append((cmd, None))
+            return
+        if status & CRSF_MSP_START_FLAG:
+            if len(data) < 2:
+                return
+            self.msp_rx = [data[1], data[0], bytearray(data[2:]), (seq + 1) & CRSF_MSP_SEQ_MASK]
+        elif self.msp_rx is None or seq != self.msp_rx[3]:
+            self.msp_rx = None  # потерян кусок — ответ отбрасываем
+            return
+        else:
+            self.msp_rx[2] += data
+            self.msp_rx[3] = (seq + 1) & CRSF_MSP_SEQ_MASK
+        cmd, size, buf, _ = self.msp_rx
+        if len(buf) >= size:
+            self.msp_rx = None
+            self.msp_responses.append((cmd, bytes(buf[:size])))
+
+    def _parse_channels(self, data: bytes):
+        """Parse RC channels from packed data."""
+        # CRSF packs 16 channels into 22 bytes, 11 bits per channel
+        if len(data) < 22:
+            return
+
+        # Unpack channels (11-bit values)
+        channels = [0] * CRSF_MAX_CHANNELS
+        bit_buffer = 0
+        bit_count = 0
+        byte_index = 0
+        channel_index = 0
+
+        while byte_index < len(data) and channel_index < CRSF_MAX_CHANNELS:
+            bit_buffer |= data[byte_index] << bit_count
+            bit_count += 8
+            byte_index += 1
+
+            while bit_count >= 11 and channel_index < CRSF_MAX_CHANNELS:
+                channels[channel_index] = bit_buffer & 0x7FF
+                bit_buffer >>= 11
+                bit_count -= 11
+                channel_index += 1
+
+        # Convert to microseconds (988-2012 range) and apply median filter
+        for i in range(CRSF_MAX_CHANNELS):
+            raw_value = channels[i]
+            # Map 0-1984 (11-bit) to 988-2012 us
+            us_value = 988 + (raw_value * (2012 - 988) // 1984)
+            self.channels[i] = self.median_filters[i].update(us_value)
+
+    def get_channel(self, channel: int) -> int:
+        """Get the value of a specific channel (1-16)."""
+        if 1 <= channel <= CRSF_MAX_CHANNELS:
+            return self.channels[channel - 1]
+        return 1500  # Default middle value
+
+    def get_packet_interval(self) -> float:
+        """Get time since last valid packet."""
+        return time.time() - self.last_packet_time
+
+    def close(self):
+        """Close serial connection."""
+        if self.serial.is_open:
+            self.serial.close()
+
+
+class CRSFMSPClient:
+    """MSPClient-compatible MSP access tunneled through an AlfredoCRSF link.
+
+    Works with the query helpers in betafly.sensors and betafly.status; RC
+    channel frames received while waiting are still processed.
+    """
+
+    def __init__(self, crsf: AlfredoCRSF, timeout: float = 1.0, profiler=None):
+        self.crsf = crsf
+        self.crsf.sync_bytes.add(CRSF_ADDRESS_RADIO_TRANSMITTER)
+        self.timeout = timeout
+        self.profiler = profiler
+        self.link = REGISTRY.link('msp-crsf')
+        self.lock = threading.RLock()
+
+    @property
+    def ser(self):
+        return self.crsf.serial
+
+    def close(self):
+        self.crsf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def mark(self, phase: str):
+        if self.profiler:
+            self.profiler.mark(phase)
+
+    def send(self, command: int, data=b''):
+        data = bytes(data)
+        self.crsf.send_msp(command, data)
+        self.link.frame_sent(command, len(data) + 3)
+        self.mark('write')
+
+    def read(self):
+        deadline = time.monotonic() + self.timeout
+        while not self.crsf.msp_responses:
+            if time.monotonic() > deadline:
+                self.link.timeout()
+                return None, None
+            self.crsf.read()
+            if not self.crsf.msp_responses:
+                time.sleep(0.001)
+        self.mark('read')
+        code, payload = self.crsf.msp_responses.popleft()
+        if payload is None:
+            self.link.checksum_error()
+            print(f"[Ошибка] FC вернул ошибку MSP для команды {code}")
+            return None, None
+        self.link.frame_received(code, len(payload) + 3)
+        return code, payload
+
+    def request(self, command: int, data=b'') -> Optional[bytes]:
+        with self.lock:
+            self.send(command, data)
+            for _ in range(4):
+                code, payload = self.read()
+                if code is None or code == command:
+                    return payload
+            return None
+
+
+def monitor(port: str = "COM8", baudrate: int = 420000, channels: int = 4,
+            low_latency: bool = False, plotter=None):
+    """Print the first ``channels`` RC channels as frames arrive.
+
+    With a ``plotter`` all 16 channels are plotted and printing is skipped.
+    """
+    crsf = AlfredoCRSF(port=port, baudrate=baudrate, low_latency=low_latency)
+    crsf.begin()
+
+    try:
+        while not (plotter and plotter.stopped.is_set()):
+            if crsf.read():
+                if plotter:
+                    now = time.monotonic()
+                    for i in range(CRSF_MAX_CHANNELS):
+                        plotter.add(f"ch{i + 1}", now, crsf.channels[i], 'channels')
+                else:
+                    print("Channels:", [crsf.get_channel(i) for i in range(1, channels + 1)])
+            time.sleep(0.001 if plotter else 0.01)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        crsf.close()
+        print("Closed")
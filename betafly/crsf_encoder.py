@@ -0,0 +1,187 @@
+"""CRSF transmitter side: frame encoder and fixed-rate RC sender.
+
+Frames are built in place into one preallocated buffer per frame type and
+the CRC is a table lookup per byte, so a 1000 Hz sender loop does no
+allocation beyond the packed-channel integer. ``CRSFSender`` needs a
+transport that writes immediately (pyserial or ``LowLatencySerial`` with
+its default ``batch_writes=False``).
+"""
+import math
+import struct
+import threading
+import time
+from array import array
+from typing import Callable, Optional, Sequence
+
+from .checksum import crc8_dvb_s2
+from .crsf import (CRSF_ADDRESS_FLIGHT_CONTROLLER, CRSF_FRAMETYPE_LINK_STATISTICS,
+                   CRSF_FRAMETYPE_RC_CHANNELS_PACKED, CRSF_MAX_CHANNELS)
+from .metrics import REGISTRY
+
+CRSF_FRAMETYPE_GPS = 0x02
+CRSF_FRAMETYPE_VARIO = 0x07
+CRSF_FRAMETYPE_BATTERY_SENSOR = 0x08
+CRSF_FRAMETYPE_ATTITUDE = 0x1E
+
+CRSF_CHANNEL_BITS = 11
+CRSF_CHANNEL_MAX = (1 << CRSF_CHANNEL_BITS) - 1
+# Сдвиги каналов внутри 176-битного поля RC_CHANNELS_PACKED
+CHANNEL_SHIFTS = tuple(i * CRSF_CHANNEL_BITS for i in range(CRSF_MAX_CHANNELS))
+
+# Полезная нагрузка кадров телеметрии (big-endian, как в CRSF)
+LINK_STATISTICS = struct.Struct('>BBBbBBBBBb')
+BATTERY = struct.Struct('>HHBHB')      # напряжение dV, ток dA, ёмкость мАч (24 бит: hi8 + lo16), остаток %
+ATTITUDE = struct.Struct('>hhh')       # pitch, roll, yaw в рад * 10000
+GPS = struct.Struct('>iiHHHB')
+VARIO = struct.Struct('>h')            # см/с
+
+
+def wrap_pi(angle: float) -> float:
+    """Wrap an angle in radians to [-pi, pi)."""
+    return (angle + math.pi) % (2 * math.pi) - math.pi
+
+
+def us_to_crsf(us: float) -> int:
+    """Inverse of AlfredoCRSF's mapping (0-1984 <-> 988-2012 us)."""
+    raw = int(round((us - 988) * 1984 / 1024))
+    return 0 if raw < 0 else CRSF_CHANNEL_MAX if raw > CRSF_CHANNEL_MAX else raw
+
+
+class CRSFEncoder:
+    """Builds CRSF frames into preallocated buffers.
+
+    Every ``*_frame`` method rewrites the same bytearray for its frame type
+    and returns it, so a sender loop allocates nothing per frame; copy the
+    result if it must outlive the next call.
+    """
+
+    def __init__(self, address: int = CRSF_ADDRESS_FLIGHT_CONTROLLER):
+        self.address = address
+        self.buffers = {}
+
+    def _buffer(self, frame_type: int, payload_size: int) -> bytearray:
+        buf = self.buffers.get(frame_type)
+        if buf is None or len(buf) != payload_size + 4:
+            buf = self.buffers[frame_type] = bytearray(payload_size + 4)
+            buf[0] = self.address
+            buf[1] = payload_size + 2  # тип + payload + crc
+            buf[2] = frame_type
+        return buf
+
+    def _finish(self, buf: bytearray) -> bytearray:
+        buf[-1] = crc8_dvb_s2(memoryview(buf)[2:-1])
+        return buf
+
+    def rc_channels_frame(self, raw: Sequence[int]) -> bytearray:
+        """RC_CHANNELS_PACKED from 16 raw 11-bit values."""
+        buf = self._buffer(CRSF_FRAMETYPE_RC_CHANNELS_PACKED, 22)
+        packed = 0
+        for value, shift in zip(raw, CHANNEL_SHIFTS):
+            packed |= (value & CRSF_CHANNEL_MAX) << shift
+        buf[3:25] = packed.to_bytes(22, 'little')
+        return self._finish(buf)
+
+    def rc_channels_us_frame(self, channels_us: Sequence[float]) -> bytearray:
+        return self.rc_channels_frame([us_to_crsf(us) for us in channels_us])
+
+    def link_statistics_frame(self, uplink_rssi_1=0, uplink_rssi_2=0, uplink_lq=100, uplink_snr=0,
+                              active_antenna=0, rf_mode=0, uplink_tx_power=0,
+                              downlink_rssi=0, downlink_lq=100, downlink_snr=0) -> bytearray:
+        buf = self._buffer(CRSF_FRAMETYPE_LINK_STATISTICS, LINK_STATISTICS.size)
+        LINK_STATISTICS.pack_into(buf, 3, uplink_rssi_1, uplink_rssi_2, uplink_lq, uplink_snr,
+                                  active_antenna, rf_mode, uplink_tx_power,
+                                  downlink_rssi, downlink_lq, downlink_snr)
+        return self._finish(buf)
+
+    def battery_frame(self, voltage: float, current: float, capacity_mah: int, remaining: int) -> bytearray:
+        buf = self._buffer(CRSF_FRAMETYPE_BATTERY_SENSOR, BATTERY.size)
+        capacity_mah = min(int(capacity_mah), 0xFFFFFF)
+        BATTERY.pack_into(buf, 3, int(round(voltage * 10)), int(round(current * 10)),
+                          capacity_mah >> 16, capacity_mah & 0xFFFF, remaining)
+        return self._finish(buf)
+
+    def attitude_frame(self, pitch: float, roll: float, yaw: float) -> bytearray:
+        """Angles in radians; wrapped to +-pi (e.g. yaw 0..2pi) to fit int16."""
+        buf = self._buffer(CRSF_FRAMETYPE_ATTITUDE, ATTITUDE.size)
+        ATTITUDE.pack_into(buf, 3, int(wrap_pi(pitch) * 10000), int(wrap_pi(roll) * 10000),
+                           int(wrap_pi(yaw) * 10000))
+        return self._finish(buf)
+
+    def gps_frame(self, lat: float, lon: float, groundspeed_kmh: float, heading_deg: float,
+                  altitude_m: float, satellites: int) -> bytearray:
+        buf = self._buffer(CRSF_FRAMETYPE_GPS, GPS.size)
+        GPS.pack_into(buf, 3, int(lat * 1e7), int(lon * 1e7), int(groundspeed_kmh * 10),
+                      int(heading_deg * 100) % 36000, int(altitude_m) + 1000, satellites)
+        return self._finish(buf)
+
+    def vario_frame(self, vertical_speed: float) -> bytearray:
+        """Vertical speed in m/s."""
+        buf = self._buffer(CRSF_FRAMETYPE_VARIO, VARIO.size)
+        VARIO.pack_into(buf, 3, int(vertical_speed * 100))
+        return self._finish(buf)
+
+
+class CRSFSender:
+    """Sends RC frames at a fixed rate and records send-time jitter.
+
+    ``source()`` returns the 16 raw channel values for the next frame. The
+    loop schedules against absolute deadlines (no drift), sleeps until just
+    before each one and spins the rest; lateness is kept in a ring buffer.
+    """
+
+    def __init__(self, serial, rate_hz: float, source: Callable[[], Sequence[int]],
+                 encoder: Optional[CRSFEncoder] = None, spin: float = 0.0005,
+                 history: int = 4096):
+        self.serial = serial
+        self.period = 1.0 / rate_hz
+        self.source = source
+        self.encoder = encoder or CRSFEncoder()
+        self.spin = spin
+        self.jitter = array('d', bytes(8 * history))
+        self.sent = 0
+        self.metrics = REGISTRY.link('crsf')
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        perf = time.perf_counter
+        deadline = perf()
+        history = len(self.jitter)
+        while not self._stop.is_set():
+            deadline += self.period
+            remaining = deadline - perf()
+            if remaining > self.spin:
+                time.sleep(remaining - self.spin)
+            while perf() < deadline:
+                pass
+            frame = self.encoder.rc_channels_frame(self.source())
+            self.serial.write(frame)
+            late = perf() - deadline
+            self.jitter[self.sent % history] = late
+            self.sent += 1
+            self.metrics.frame_sent(CRSF_FRAMETYPE_RC_CHANNELS_PACKED, len(frame))
+            if late > self.period:
+                # Сильно отстали (например, GC) — не пытаемся догонять пачкой кадров
+                deadline = perf()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def jitter_stats(self) -> dict:
+        """Lateness of recent frames (seconds): p50, p99, max."""
+        count = min(self.sent, len(self.jitter))
+        if not count:
+            return {'frames': 0}
+        values = sorted(self.jitter[:count])
+        return {'frames': self.sent, 'p50': values[count // 2],
+                'p99': values[min(count - 1, int(count * 0.99))], 'max': values[-1]}
@@ -0,0 +1,180 @@
+import mmap
+import os
+import struct
+import time
+from collections import deque
+from typing import Optional
+
+from .msp import MSP_DATAFLASH_READ, MSP_DATAFLASH_SUMMARY, MSPClient, unpack
+
+# Заголовок файла прогресса: chunk_size, total_size; дальше по байту на чанк
+PROGRESS_HEADER = struct.Struct('<II')
+MAX_RETRIES = 5
+
+
+def get_summary(client: MSPClient) -> Optional[dict]:
+    """MSP_DATAFLASH_SUMMARY: flags, sectors, total and used size."""
+    values = unpack('<BIII', client.request(MSP_DATAFLASH_SUMMARY))
+    if values is None:
+        return None
+    flags, sectors, total, used = values
+    return {'ready': bool(flags & 1), 'supported': bool(flags & 2),
+            'sectors': sectors, 'total_size': total, 'used_size': used}
+
+
+def _read_request(address: int, size: int) -> bytes:
+    # address, запрошенный размер, без сжатия (ответ в новом формате с байтом сжатия)
+    return struct.pack('<IHB', address, size, 0)
+
+
+def _parse_read(data: bytes):
+    values = unpack('<IHB', data)
+    if values is None:
+        return None
+    address, size, compression = values
+    return address, compression, data[7:7 + size]
+
+
+class DataflashDownloader:
+    """Bulk blackbox download with several MSP_DATAFLASH_READ in flight.
+
+    Chunks are written straight into a preallocated, memory-mapped output
+    file. A ``<path>.progress`` sidecar records finished chunks, so a run
+    interrupted by a disconnect resumes where it stopped; it is removed once
+    the download completes.
+    """
+
+    def __init__(self, client: MSPClient, path: str, chunk_size: int = 4096,
+                 in_flight: int = 4, report_every: float = 1.0):
+        self.client = client
+        self.path = path
+        self.progress_path = path + '.progress'
+        self.chunk_size = chunk_size
+        self.in_flight = in_flight
+        self.report_every = report_every
+
+    def probe_chunk_size(self) -> int:
+        """Ask for ``chunk_size`` bytes; the FC returns as much as it allows."""
+        data = self.client.request(MSP_DATAFLASH_READ, _read_request(0, self.chunk_size))
+        parsed = _parse_read(data) if data else None
+        if parsed is None or not parsed[2]:
+            raise IOError("MSP_DATAFLASH_READ не поддерживается или флешка пуста")
+        return len(parsed[2])
+
+    def _open_progress(self, total: int):
+        if os.path.exists(self.progress_path) and os.path.exists(self.path):
+            with open(self.progress_path, 'rb') as f:
+                chunk, stored_total = PROGRESS_HEADER.unpack(f.read(PROGRESS_HEADER.size))
+            if stored_total == total:
+                print(f"[dataflash] Продолжаем загрузку (чанк {chunk} байт)")
+                return chunk, open(self.progress_path, 'r+b')
+        chunk = self.probe_chunk_size()
+        count = -(-total // chunk)
+        f = open(self.progress_path, 'w+b')
+        f.write(PROGRESS_HEADER.pack(chunk, total) + bytes(count))
+        f.flush()
+        return chunk, f
+
+    def run(self) -> bool:
+        summary = get_summary(self.client)
+        if summary is None or not summary['supported']:
+            print("[dataflash] Dataflash не поддерживается")
+            return False
+        total = summary['used_size']
+        if total == 0:
+            print("[dataflash] Флешка пуста")
+            return True
+
+        with self.client.lock:
+            try:
+                chunk, progress_file = self._open_progress(total)
+            except IOError as e:
+                print(f"[dataflash] {e}")
+                return False
+            try:
+                with open(self.path, 'r+b' if os.path.exists(self.path) else 'w+b') as out:
+                    out.truncate(total)
+                    with mmap.mmap(out.fileno(), total) as mm, \
+                            mmap.mmap(progress_file.fileno(), 0) as progress:
+                        done = self._download(mm, progress, chunk, total)
+                        mm.flush()
+            except IOError as e:
+                print(f"[dataflash] {e}, прогресс сохранён в {self.progress_path}")
+                return False
+            finally:
+                progress_file.close()
+
+        if done:
+            os.remove(self.progress_path)
+        return done
+
+    def _download(self, mm, progress, chunk: int, total: int) -> bool:
+        client = self.client
+        base = PROGRESS_HEADER.size
+        count = -(-total // chunk)
+        # Очередь запросов (address, size); неполный ответ дочитывается отдельным запросом
+        todo = deque((i * chunk, min(chunk, total - i * chunk))
+                     for i in range(count) if not progress[base + i])
+        remaining = sum(size for _, size in todo)
+        filled = {}
+        outstanding = {}
+        retries = 0
+        received = 0
+        start = last_report = time.monotonic()
+
+        while todo or outstanding:
+            while todo and len(outstanding) < self.in_flight:
+                address, size = todo.popleft()
+                client.send(MSP_DATAFLASH_READ, _read_request(address, size))
+                outstanding[address] = size
+
+            code, data = client.read()
+            if code is None:
+                # Таймаут: переотправляем всё, что было в полёте
+                retries += 1
+                if retries > MAX_RETRIES:
+                    print(f"[dataflash] Связь потеряна, прогресс сохранён в {self.progress_path}")
+                    progress.flush()
+                    return False
+                todo.extendleft(sorted(outstanding.items(), reverse=True))
+                outstanding.clear()
+                client.ser.reset_input_buffer()
+                continue
+            if code != MSP_DATAFLASH_READ:
+                continue
+            parsed = _parse_read(data)
+            if parsed is None:
+                continue
+            address, compression, payload = parsed
+            requested = outstanding.pop(address, None)
+            if requested is None:
+                continue  # дубликат после переотправки
+            if compression:
+                raise IOError("Сжатый ответ dataflash не поддерживается")
+            n = min(len(payload), total - address)
+            if n <= 0:
+                retries += 1
+                todo.appendleft((address, requested))
+                continue
+            retries = 0
+            mm[address:address + n] = payload[:n]
+            if n < requested:
+                todo.appendleft((address + n, requested - n))
+            index = address // chunk
+            filled[index] = filled.get(index, 0) + n
+            if filled[index] >= min(chunk, total - index * chunk):
+                progress[base + index] = 1
+                del filled[index]
+            received += n
+
+            now = time.monotonic()
+            if now - last_report >= self.report_every:
+                last_report = now
+                rate = received / (now - start)
+                eta = (remaining - received) / rate if rate else float('inf')
+                print(f"[dataflash] {received}/{remaining} байт, {rate / 1024:.1f} KiB/s, осталось {eta:.0f} s")
+
+        elapsed = time.monotonic() - start
+        print(f"[dataflash] Готово: {received} байт за {elapsed:.1f} s "
+              f"({received / elapsed / 1024 if elapsed else 0:.1f} KiB/s)")
+        return True
@@ -0,0 +1,216 @@
+"""MSP_RAW_IMU: all nine axes, batched calibration and offline fitting.
+
+``ImuBuffer`` keeps raw samples (acc, gyro, mag as int16) plus timestamps
+in fixed ``array`` storage. ``ImuCalibration`` folds per-sensor scale,
+bias and 3x3 misalignment into one 9x9 matrix and offset, so a whole batch
+converts with a single ``raw @ A.T + c``. The fitting routines work on
+recorded arrays: gyro bias from a still recording, accelerometer from six
+static positions, magnetometer hard/soft iron from an ellipsoid fit.
+"""
+import json
+import struct
+from array import array
+from typing import Optional, Sequence
+
+import numpy as np
+
+RAW_IMU = struct.Struct('<9h')  # acc[3], gyro[3], mag[3]
+AXES = ('ax', 'ay', 'az', 'gx', 'gy', 'gz', 'mx', 'my', 'mz')
+SENSORS = ('acc', 'gyro', 'mag')
+
+# Betaflight: acc в единицах 1g = 512, gyro в град/с, mag — сырые отсчёты
+ACC_1G = 512
+DEFAULT_SCALES = {'acc': 1.0 / ACC_1G, 'gyro': 1.0, 'mag': 1.0}
+
+CALIBRATION_VERSION = 1
+
+
+def decode_raw_imu(payload: bytes) -> Optional[tuple]:
+    """Nine raw int16 values from an MSP_RAW_IMU payload."""
+    if payload is None or len(payload) < RAW_IMU.size:
+        return None
+    return RAW_IMU.unpack_from(payload)
+
+
+class ImuBuffer:
+    """Ring of raw nine-axis samples backed by ``array('h')``."""
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self.raw = array('h', bytes(RAW_IMU.size * capacity))
+        self.times = array('d', bytes(8 * capacity))
+        self.count = 0
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, t: float, values: Sequence[int]):
+        i = self.count % self.capacity
+        self.raw[i * 9:i * 9 + 9] = array('h', values)
+        self.times[i] = t
+        self.count += 1
+
+    def append_payload(self, t: float, payload: bytes) -> bool:
+        """Store an MSP_RAW_IMU payload without unpacking it into Python ints."""
+        if payload is None or len(payload) < RAW_IMU.size:
+            return False
+        i = self.count % self.capacity
+        np.frombuffer(self.raw, dtype='<i2')[i * 9:i * 9 + 9] = np.frombuffer(payload, dtype='<i2', count=9)
+        self.times[i] = t
+        self.count += 1
+        return True
+
+    def arrays(self):
+        """(times, raw N x 9 int16), oldest first; copies."""
+        n = len(self)
+        raw = np.frombuffer(self.raw, dtype=np.int16).reshape(self.capacity, 9)
+        times = np.frombuffer(self.times, dtype=np.float64)
+        start = self.count % self.capacity if self.count > self.capacity else 0
+        order = (np.arange(n) + start) % self.capacity
+        return times[order], raw[order]
+
+    def save(self, path: str):
+        """Write an ``.npz`` with ``t`` and ``raw`` for the offline fits."""
+        t, raw = self.arrays()
+        np.savez(path, t=t, raw=raw)
+
+
+def load_recording(path: str):
+    """(t, raw) from a file written by ``ImuBuffer.save``."""
+    with np.load(path) as data:
+        return data['t'], data['raw']
+
+
+class SensorCalibration:
+    """calibrated = matrix @ (scale * raw - bias) for one three-axis sensor."""
+
+    def __init__(self, scale: float = 1.0, bias=(0.0, 0.0, 0.0), matrix=None):
+        self.scale = scale
+        self.bias = np.asarray(bias, dtype=float)
+        self.matrix = np.eye(3) if matrix is None else np.asarray(matrix, dtype=float)
+
+    def to_dict(self) -> dict:
+        return {'scale': self.scale, 'bias': self.bias.tolist(), 'matrix': self.matrix.tolist()}
+
+    @classmethod
+    def from_dict(cls, doc: dict) -> 'SensorCalibration':
+        return cls(doc['scale'], doc['bias'], doc['matrix'])
+
+
+class ImuCalibration:
+    def __init__(self, acc: Optional[SensorCalibration] = None, gyro: Optional[SensorCalibration] = None,
+                 mag: Optional[SensorCalibration] = None):
+        self.sensors = {
+            'acc': acc or SensorCalibration(DEFAULT_SCALES['acc']),
+            'gyro': gyro or SensorCalibration(DEFAULT_SCALES['gyro']),
+            'mag': mag or SensorCalibration(DEFAULT_SCALES['mag']),
+        }
+        self._affine = None
+
+    def __getitem__(self, sensor: str) -> SensorCalibration:
+        return self.sensors[sensor]
+
+    def __setitem__(self, sensor: str, calibration: SensorCalibration):
+        self.sensors[sensor] = calibration
+        self._affine = None
+
+    def affine(self):
+        """(A 9x9, c 9) with calibrated = raw @ A.T + c."""
+        if self._affine is None:
+            a = np.zeros((9, 9))
+            c = np.zeros(9)
+            for k, name in enumerate(SENSORS):
+                cal = self.sensors[name]
+                block = slice(3 * k, 3 * k + 3)
+                a[block, block] = cal.matrix * cal.scale
+                c[block] = -cal.matrix @ cal.bias
+            self._affine = a, c
+        return self._affine
+
+    def apply(self, raw) -> np.ndarray:
+        """Calibrate one sample (9 values) or a batch (N x 9) in one matrix product."""
+        a, c = self.affine()
+        return np.asarray(raw, dtype=float) @ a.T + c
+
+    # ====== Хранение ======
+
+    def to_json(self) -> str:
+        return json.dumps({'version': CALIBRATION_VERSION,
+                           **{name: cal.to_dict() for name, cal in self.sensors.items()}}, indent=1)
+
+    @classmethod
+    def from_json(cls, text: str) -> 'ImuCalibration':
+        doc = json.loads(text)
+        if doc['version'] > CALIBRATION_VERSION:
+            raise ValueError(f"Неподдерживаемая версия калибровки: {doc['version']}")
+        return cls(**{name: SensorCalibration.from_dict(doc[name]) for name in SENSORS if name in doc})
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            f.write(self.to_json())
+
+    @classmethod
+    def load(cls, path: str) -> 'ImuCalibration':
+        with open(path) as f:
+            return cls.from_json(f.read())
+
+
+# ====== Калибровка по записанным данным ======
+
+def fit_gyro_bias(gyro, scale: float = DEFAULT_SCALES['gyro']) -> SensorCalibration:
+    """Bias from a recording with the craft standing still (N x 3 raw gyro)."""
+    gyro = np.asarray(gyro, dtype=float) * scale
+    return SensorCalibration(scale, gyro.mean(axis=0))
+
+
+def fit_accel_six_position(positions, scale: float = DEFAULT_SCALES['acc']) -> SensorCalibration:
+    """Scale, bias and misalignment from six static positions.
+
+    ``positions`` is a list of N x 3 raw accelerometer recordings, one per
+    face (each axis up and down, any order). The expected vector of every
+    position is +-1 g along its dominant axis; an affine map is fitted to
+    all samples by least squares.
+    """
+    samples, targets = [], []
+    for rec in positions:
+        rec = np.asarray(rec, dtype=float) * scale
+        mean = rec.mean(axis=0)
+        axis = int(np.argmax(np.abs(mean)))
+        target = np.zeros(3)
+        target[axis] = np.sign(mean[axis])
+        samples.append(rec)
+        targets.append(np.broadcast_to(target, rec.shape))
+    x = np.vstack(samples)
+    y = np.vstack(targets)
+    covered = {(int(np.argmax(np.abs(t[0]))), t[0].max() > 0) for t in targets}
+    if len(covered) < 6:
+        raise ValueError("Нужны шесть положений: каждая ось вверх и вниз")
+    # y = x @ W[:3] + W[3]  =>  matrix = W[:3].T, bias = -matrix^-1 @ W[3]
+    w, *_ = np.linalg.lstsq(np.hstack([x, np.ones((len(x), 1))]), y, rcond=None)
+    matrix = w[:3].T
+    bias = -np.linalg.solve(matrix, w[3])
+    return SensorCalibration(scale, bias, matrix)
+
+
+def fit_mag_hard_soft_iron(mag, scale: float = DEFAULT_SCALES['mag']) -> SensorCalibration:
+    """Hard iron (centre) and soft iron (ellipsoid -> sphere) from a rotation recording.
+
+    Fits a general ellipsoid to N x 3 raw samples taken while turning the
+    craft through all orientations; the output sphere keeps the mean radius
+    of the ellipsoid, so units stay those of the raw data times ``scale``.
+    """
+    m = np.asarray(mag, dtype=float) * scale
+    x, y, z = m.T
+    # a x² + b y² + c z² + 2f yz + 2g xz + 2h xy + 2p x + 2q y + 2r z = 1
+    design = np.column_stack([x * x, y * y, z * z, 2 * y * z, 2 * x * z, 2 * x * y, 2 * x, 2 * y, 2 * z])
+    v, *_ = np.linalg.lstsq(design, np.ones(len(m)), rcond=None)
+    a, b, c, f, g, h, p, q, r = v
+    quad = np.array([[a, h, g], [h, b, f], [g, f, c]])
+    centre = -np.linalg.solve(quad, [p, q, r])
+    quad /= 1.0 + centre @ quad @ centre
+    eigval, eigvec = np.linalg.eigh(quad)
+    if np.any(eigval <= 0):
+        raise ValueError("Данные не ложатся на эллипсоид: покрутите аппарат во всех направлениях")
+    radius = np.prod(1.0 / np.sqrt(eigval)) ** (1.0 / 3.0)
+    matrix = eigvec @ np.diag(np.sqrt(eigval)) @ eigvec.T * radius
+    return SensorCalibration(scale, centre, matrix)
@@ -0,0 +1,223 @@
+"""Low-latency serial transport for Linux.
+
+``LowLatencySerial`` covers the subset of ``serial.Serial`` this package
+uses (read/write/flush/in_waiting/reset_*_buffer/open/close/is_open) on top
+of a raw termios file descriptor:
+
+* raw mode with VMIN/VTIME tuned for poll-driven, non-blocking reads;
+* ASYNC_LOW_LATENCY via TIOCSSERIAL and a 1 ms FTDI latency timer where the
+  driver and permissions allow it;
+* reads go into one preallocated buffer with ``os.readv`` (readinto);
+* with ``batch_writes`` (MSPClient turns it on), writes are held and
+  flushed right before the next read or ``in_waiting``, so a burst of
+  requests leaves in a single syscall; by default every write goes out
+  immediately, as with pyserial.
+"""
+import array
+import errno
+import fcntl
+import os
+import select
+import struct
+import termios
+import time
+from typing import Optional
+
+# ioctl из <asm-generic/ioctls.h> и <linux/serial.h>
+TIOCGSERIAL = 0x541E
+TIOCSSERIAL = 0x541F
+ASYNC_LOW_LATENCY = 1 << 13
+SERIAL_STRUCT_FLAGS_OFFSET = 16  # type, line, port, irq, flags
+TCGETS2 = 0x802C542A
+TCSETS2 = 0x402C542B
+BOTHER = 0o010000
+CBAUD = 0o010017
+
+
+class LowLatencySerial:
+    def __init__(self, port: str, baudrate: int = 115200, timeout: Optional[float] = 0.1,
+                 vmin: int = 0, vtime: int = 0, buffer_size: int = 4096,
+                 batch_writes: bool = False):
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.vmin = vmin    # 0/0: read() никогда не блокируется в ядре, ждём через poll
+        self.vtime = vtime
+        self.batch_writes = batch_writes
+        self.fd: Optional[int] = None
+        self.poller = None
+        self._buf = bytearray(buffer_size)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._end = 0
+        self._out = bytearray()
+        self.open()
+
+    # ====== Открытие и настройка ======
+
+    @property
+    def is_open(self) -> bool:
+        return self.fd is not None
+
+    def open(self):
+        if self.fd is not None:
+            return
+        self.fd = os.open(self.port, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+        try:
+            self._configure()
+        except Exception:
+            os.close(self.fd)
+            self.fd = None
+            raise
+        self.poller = select.poll()
+        self.poller.register(self.fd, select.POLLIN)
+        self.set_low_latency()
+
+    def _configure(self):
+        iflag, oflag, cflag, lflag, ispeed, ospeed, cc = termios.tcgetattr(self.fd)
+        # Аналог cfmakeraw: без эха, канонического режима и преобразований
+        iflag &= ~(termios.IGNBRK | termios.BRKINT | termios.PARMRK | termios.ISTRIP | termios.INLCR
+                   | termios.IGNCR | termios.ICRNL | termios.IXON | termios.IXOFF | termios.IXANY)
+        oflag &= ~termios.OPOST
+        lflag &= ~(termios.ECHO | termios.ECHONL | termios.ICANON | termios.ISIG | termios.IEXTEN)
+        cflag &= ~(termios.CSIZE | termios.PARENB | termios.CSTOPB | termios.CRTSCTS)
+        cflag |= termios.CS8 | termios.CREAD | termios.CLOCAL
+        cc[termios.VMIN] = self.vmin
+        cc[termios.VTIME] = self.vtime
+        speed = getattr(termios, f'B{self.baudrate}', None)
+        if speed is not None:
+            ispeed = ospeed = speed
+        termios.tcsetattr(self.fd, termios.TCSANOW, [iflag, oflag, cflag, lflag, ispeed, ospeed, cc])
+        if speed is None:
+            self._set_custom_baudrate(self.baudrate)
+        termios.tcflush(self.fd, termios.TCIOFLUSH)
+
+    def _set_custom_baudrate(self, baudrate: int):
+        """Non-standard rates (e.g. CRSF 420000) via termios2/BOTHER."""
+        buf = array.array('i', [0] * 64)
+        fcntl.ioctl(self.fd, TCGETS2, buf)
+        buf[2] = (buf[2] & ~CBAUD) | BOTHER  # c_cflag
+        buf[9] = buf[10] = baudrate         # c_ispeed, c_ospeed
+        fcntl.ioctl(self.fd, TCSETS2, buf)
+
+    def set_low_latency(self) -> bool:
+        """Best effort: ASYNC_LOW_LATENCY and the FTDI latency timer."""
+        ok = False
+        try:
+            buf = bytearray(128)
+            fcntl.ioctl(self.fd, TIOCGSERIAL, buf)
+            flags = struct.unpack_from('<i', buf, SERIAL_STRUCT_FLAGS_OFFSET)[0]
+            struct.pack_into('<i', buf, SERIAL_STRUCT_FLAGS_OFFSET, flags | ASYNC_LOW_LATENCY)
+            fcntl.ioctl(self.fd, TIOCSSERIAL, buf)
+            ok = True
+        except OSError:
+            pass  # драйвер не поддерживает (например, cdc_acm)
+        # FTDI по умолчанию копит данные до 16 мс
+        timer = f'/sys/bus/usb-serial/devices/{os.path.basename(os.path.realpath(self.port))}/latency_timer'
+        try:
+            with open(timer, 'w') as f:
+                f.write('1')
+            ok = True
+        except OSError:
+            pass
+        return ok
+
+    def close(self):
+        if self.fd is None:
+            return
+        try:
+            self.flush()
+        finally:
+            os.close(self.fd)
+            self.fd = None
+            self.poller = None
+
+    # ====== Чтение ======
+
+    def _fill(self, timeout: Optional[float]) -> int:
+        """Read whatever is available into the buffer, waiting up to ``timeout``."""
+        if self._start == self._end:
+            self._start = self._end = 0
+        elif self._end == len(self._buf):
+            # Сдвигаем непрочитанный хвост в начало буфера
+            n = self._end - self._start
+            self._buf[:n] = self._buf[self._start:self._end]
+            self._start, self._end = 0, n
+        if timeout is None or timeout > 0:
+            if not self.poller.poll(None if timeout is None else timeout * 1000):
+                return 0
+        try:
+            n = os.readv(self.fd, [self._view[self._end:]])
+        except BlockingIOError:
+            return 0
+        self._end += n
+        return n
+
+    def read(self, size: int = 1) -> bytes:
+        if self._out:
+            self.flush()
+        if self._end - self._start >= size:
+            data = bytes(self._view[self._start:self._start + size])
+            self._start += size
+            return data
+        # Копируем по частям: запрос может быть больше внутреннего буфера
+        out = bytearray()
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while True:
+            n = min(size - len(out), self._end - self._start)
+            if n:
+                out += self._view[self._start:self._start + n]
+                self._start += n
+            if len(out) >= size:
+                break
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                # Как pyserial при timeout=0: забираем то, что уже пришло, без ожидания
+                if self._fill(0):
+                    continue
+                break
+            self._fill(remaining)
+        return bytes(out)
+
+    def readinto(self, b) -> int:
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    @property
+    def in_waiting(self) -> int:
+        if self._out:
+            self.flush()  # иначе опрос in_waiting без read() ничего не отправит
+        buf = array.array('i', [0])
+        fcntl.ioctl(self.fd, termios.FIONREAD, buf)
+        return buf[0] + self._end - self._start
+
+    def reset_input_buffer(self):
+        self._start = self._end = 0
+        termios.tcflush(self.fd, termios.TCIFLUSH)
+
+    # ====== Запись ======
+
+    def write(self, data) -> int:
+        self._out += data
+        if not self.batch_writes:
+            self.flush()
+        return len(data)
+
+    def flush(self):
+        view = memoryview(self._out)
+        sent = 0
+        while sent < len(view):
+            try:
+                sent += os.write(self.fd, view[sent:])
+            except BlockingIOError:
+                select.select([], [self.fd], [], self.timeout)
+            except OSError as e:
+                if e.errno != errno.EINTR:
+                    raise
+        view.release()
+        self._out.clear()
+
+    def reset_output_buffer(self):
+        self._out.clear()
+        termios.tcflush(self.fd, termios.TCOFLUSH)
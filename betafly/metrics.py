@@ -0,0 +1,244 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+# Границы гистограммы задержек (секунды); память фиксирована числом корзин
+LATENCY_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0)
+RATE_WINDOW = 10  # секунд в скользящем окне bytes/sec
+PENDING_LIMIT = 32     # запросов одного кода в полёте, которые помним
+PENDING_TIMEOUT = 2.0  # старше — считаем, что ответ потерян
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (Prometheus-compatible)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # последняя корзина: +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        i = 0
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate quantile: upper bound of the bucket containing q."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return float('inf')
+
+    def snapshot(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'buckets': dict(zip(self.buckets + (float('inf'),), self.counts)),
+            'p50': self.quantile(0.5),
+            'p99': self.quantile(0.99),
+        }
+
+
+class RateMeter:
+    """Bytes/sec over a sliding window of one-second slots."""
+
+    def __init__(self, window: int = RATE_WINDOW):
+        self.window = window
+        self.slots = [0] * window
+        self.slot_time = [0] * window
+
+    def add(self, n: int, now: Optional[float] = None):
+        sec = int(now if now is not None else time.monotonic())
+        i = sec % self.window
+        if self.slot_time[i] != sec:
+            self.slot_time[i] = sec
+            self.slots[i] = 0
+        self.slots[i] += n
+
+    def rate(self, now: Optional[float] = None) -> float:
+        sec = int(now if now is not None else time.monotonic())
+        total = sum(s for s, t in zip(self.slots, self.slot_time) if sec - self.window < t <= sec)
+        return total / self.window
+
+
+class LinkMetrics:
+    """Counters for one link (e.g. 'msp' or 'crsf')."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.lock = threading.Lock()
+        self.frames_sent: Dict[int, int] = {}
+        self.frames_received: Dict[int, int] = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.checksum_errors = 0
+        self.header_errors = 0
+        self.timeouts = 0
+        self.latency: Dict[int, Histogram] = {}
+        self.tx_rate = RateMeter()
+        self.rx_rate = RateMeter()
+        self._pending: Dict[int, Deque[float]] = {}
+
+    def frame_sent(self, code: int, nbytes: int):
+        now = time.monotonic()
+        with self.lock:
+            self.frames_sent[code] = self.frames_sent.get(code, 0) + 1
+            self.bytes_sent += nbytes
+            self.tx_rate.add(nbytes, now)
+            pending = self._pending.get(code)
+            if pending is None:
+                pending = self._pending[code] = deque(maxlen=PENDING_LIMIT)
+            pending.append(now)
+
+    def frame_received(self, code: int, nbytes: int):
+        now = time.monotonic()
+        with self.lock:
+            self.frames_received[code] = self.frames_received.get(code, 0) + 1
+            self.bytes_received += nbytes
+            self.rx_rate.add(nbytes, now)
+            # Несколько запросов одного кода в полёте: ответ — самому старому
+            pending = self._pending.get(code)
+            while pending and now - pending[0] > PENDING_TIMEOUT:
+                pending.popleft()
+            started = pending.popleft() if pending else None
+            if started is not None:
+                hist = self.latency.get(code)
+                if hist is None:
+                    hist = self.latency[code] = Histogram()
+                hist.observe(now - started)
+
+    def checksum_error(self):
+        with self.lock:
+            self.checksum_errors += 1
+
+    def header_error(self):
+        with self.lock:
+            self.header_errors += 1
+
+    def timeout(self):
+        with self.lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                'frames_sent': dict(self.frames_sent),
+                'frames_received': dict(self.frames_received),
+                'bytes_sent': self.bytes_sent,
+                'bytes_received': self.bytes_received,
+                'tx_bytes_per_sec': self.tx_rate.rate(),
+                'rx_bytes_per_sec': self.rx_rate.rate(),
+                'checksum_errors': self.checksum_errors,
+                'header_errors': self.header_errors,
+                'timeouts': self.timeouts,
+                'latency': {code: h.snapshot() for code, h in self.latency.items()},
+            }
+
+
+class MetricsRegistry:
+    """Process-wide set of link metrics."""
+
+    def __init__(self):
+        self.links: Dict[str, LinkMetrics] = {}
+        self.lock = threading.Lock()
+
+    def link(self, name: str) -> LinkMetrics:
+        with self.lock:
+            if name not in self.links:
+                self.links[name] = LinkMetrics(name)
+            return self.links[name]
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            links = list(self.links.values())
+        return {link.name: link.snapshot() for link in links}
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in Prometheus text exposition format."""
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f'# HELP betafly_{name} {help_text}')
+            lines.append(f'# TYPE betafly_{name} {kind}')
+
+        snap = self.snapshot()
+        metric('frames_sent_total', 'counter', 'Frames sent by code/type')
+        for link, s in snap.items():
+            for code, n in sorted(s['frames_sent'].items()):
+                lines.append(f'betafly_frames_sent_total{{link="{link}",code="{code}"}} {n}')
+        metric('frames_received_total', 'counter', 'Frames received by code/type')
+        for link, s in snap.items():
+            for code, n in sorted(s['frames_received'].items()):
+                lines.append(f'betafly_frames_received_total{{link="{link}",code="{code}"}} {n}')
+        for key, kind, help_text in (
+            ('bytes_sent', 'counter', 'Bytes written to the link'),
+            ('bytes_received', 'counter', 'Bytes read from the link'),
+            ('checksum_errors', 'counter', 'Frames dropped on checksum/CRC mismatch'),
+            ('header_errors', 'counter', 'Invalid frame headers'),
+            ('timeouts', 'counter', 'Reads that timed out'),
+            ('tx_bytes_per_sec', 'gauge', 'Transmit rate over the sliding window'),
+            ('rx_bytes_per_sec', 'gauge', 'Receive rate over the sliding window'),
+        ):
+            name = key + '_total' if kind == 'counter' else key
+            metric(name, kind, help_text)
+            for link, s in snap.items():
+                lines.append(f'betafly_{name}{{link="{link}"}} {s[key]}')
+        metric('latency_seconds', 'histogram', 'Request/response round-trip latency')
+        for link, s in snap.items():
+            for code, h in sorted(s['latency'].items()):
+                labels = f'link="{link}",code="{code}"'
+                cumulative = 0
+                for bound, n in h['buckets'].items():
+                    cumulative += n
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'betafly_latency_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f'betafly_latency_seconds_sum{{{labels}}} {h["sum"]}')
+                lines.append(f'betafly_latency_seconds_count{{{labels}}} {h["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """Write metrics atomically for node_exporter's textfile collector."""
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+    def serve_prometheus(self, port: int = 9464, host: str = '127.0.0.1'):
+        """Serve /metrics on localhost from a daemon thread."""
+        from http.server import BaseHTTPRequestHandler, HTTPServer
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+# Общий реестр процесса
+REGISTRY = MetricsRegistry()
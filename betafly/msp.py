@@ -0,0 +1,194 @@
+import struct
+import sys
+import threading
+from typing import Optional, Tuple
+
+from .checksum import xor8
+from .metrics import REGISTRY
+
+# Настройки подключения по умолчанию
+SERIAL_PORT = 'COM8'
+BAUD_RATE = 115200
+
+# Коды команд MSP
+MSP_API_VERSION = 1
+MSP_MODE_RANGES = 34
+MSP_SET_MODE_RANGE = 35
+MSP_FEATURE_CONFIG = 36
+MSP_SET_FEATURE_CONFIG = 37
+MSP_RX_CONFIG = 44
+MSP_SET_RX_CONFIG = 45
+MSP_RX_MAP = 64
+MSP_SET_RX_MAP = 65
+MSP_DATAFLASH_SUMMARY = 70
+MSP_DATAFLASH_READ = 71
+MSP_STATUS = 101
+MSP_RAW_IMU = 102
+MSP_ATTITUDE = 108
+MSP_ALTITUDE = 109
+MSP_RC_TUNING = 111
+MSP_PID = 112
+MSP_BOX = 113
+MSP_BOXNAMES = 116
+MSP_BOXIDS = 119
+MSP_STATUS_EX = 150
+MSP_SET_RAW_RC = 200
+MSP_SET_PID = 202
+MSP_SET_RC_TUNING = 204
+MSP_SET_ARMING = 214  # может отличаться, зависит от прошивки
+MSP_EEPROM_WRITE = 250
+
+JUMBO_FRAME_SIZE = 255  # size == 255: длина ответа передаётся отдельным uint16
+MAX_RESYNC_BYTES = 1024  # сколько мусора пропускаем в поисках "$M"
+
+
+def checksum(data, crc: int = 0) -> int:
+    """MSP v1 checksum: XOR of size, command and payload bytes."""
+    return xor8(data, crc)
+
+
+def build_packet(command: int, payload: bytes = b'') -> bytes:
+    size = len(payload)
+    chk = checksum(payload, size ^ command)
+    return b'$M<' + bytes((size, command)) + payload + bytes((chk,))
+
+
+class MSPClient:
+    """MSP v1 connection that opens the serial port on first use.
+
+    ``profiler`` may be a CycleProfiler; the client then charges write,
+    wait-for-first-byte, read and checksum phases to it.
+    """
+
+    def __init__(self, port: str = SERIAL_PORT, baudrate: int = BAUD_RATE,
+                 timeout: float = 0.1, profiler=None, low_latency: bool = False):
+        self.port = port
+        self.low_latency = low_latency  # Linux: raw termios вместо pyserial
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.profiler = profiler
+        self.link = REGISTRY.link('msp')
+        self._ser = None
+        # Один запрос-ответ за раз: клиентом могут пользоваться несколько потоков
+        self.lock = threading.RLock()
+
+    @property
+    def ser(self):
+        if self._ser is None:
+            self.open()
+        return self._ser
+
+    def open(self):
+        if self.low_latency:
+            if not sys.platform.startswith('linux'):
+                raise RuntimeError("low_latency: LowLatencySerial работает только в Linux (termios)")
+            from .lowlatency import LowLatencySerial
+
+            # Каждый send() здесь завершается read(), так что запись можно копить
+            self._ser = LowLatencySerial(self.port, self.baudrate, timeout=self.timeout, batch_writes=True)
+            return
+
+        import serial  # pyserial грузим только когда порт действительно нужен
+
+        # serial_for_url понимает и обычные порты, и socket://, rfc2217://
+        self._ser = serial.serial_for_url(self.port, self.baudrate, timeout=self.timeout)
+
+    def close(self):
+        if self._ser is not None and self._ser.is_open:
+            self._ser.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def mark(self, phase: str):
+        if self.profiler:
+            self.profiler.mark(phase)
+
+    def send(self, command: int, data=b''):
+        """Send a request; ``data`` is bytes or a list of byte values."""
+        packet = build_packet(command, bytes(data))
+        self.ser.write(packet)
+        self.link.frame_sent(command, len(packet))
+        self.mark('write')
+
+    def read(self) -> Tuple[Optional[int], Optional[bytes]]:
+        """Read one response; returns (None, None) on any framing error.
+
+        An error reply (``$M!``) is consumed whole and returned as
+        ``(code, None)``; junk before a header is skipped up to the next ``$M``.
+        """
+        ser = self.ser
+        header = ser.read(1)
+        self.mark('wait')
+        header += ser.read(2)
+        skipped = 0
+        while header[:2] != b'$M' or header[2:] not in (b'>', b'!'):
+            if len(header) < 3:
+                self.link.timeout()
+                return None, None
+            skipped += 1
+            if skipped > MAX_RESYNC_BYTES:
+                self.link.header_error()
+                print("[Ошибка] Не найден заголовок MSP")
+                return None, None
+            # Сдвигаемся на байт: ищем следующий "$M" в потоке
+            header = header[1:] + ser.read(1)
+        if skipped:
+            self.link.header_error()
+            print(f"[Ошибка] Пропущено {skipped} байт до заголовка MSP")
+        head = ser.read(2)
+        if len(head) < 2:
+            self.link.timeout()
+            return None, None
+        size, code = head
+        if size == JUMBO_FRAME_SIZE:
+            # Jumbo-кадр MSP v1: настоящая длина — следующие два байта
+            ext = ser.read(2)
+            if len(ext) < 2:
+                self.link.timeout()
+                return None, None
+            head += ext
+            size = ext[0] | ext[1] << 8
+        data = ser.read(size + 1)
+        self.mark('read')
+        if len(data) != size + 1:
+            self.link.timeout()
+            print(f"[Ошибка] Неполные данные: ожидалось {size} байт, получено {max(0, len(data) - 1)}")
+            return None, None
+        data, received = data[:-1], data[-1]
+        if checksum(data, checksum(head)) != received:
+            self.link.checksum_error()
+            print("[Ошибка] Неверная контрольная сумма MSP")
+            return None, None
+        self.mark('checksum')
+        self.link.frame_received(code, len(head) + size + 4)
+        if header[2:] == b'!':
+            print(f"[Ошибка] FC вернул ошибку MSP для команды {code}")
+            return code, None
+        return code, data
+
+    def request(self, command: int, data=b'') -> Optional[bytes]:
+        """Send ``command`` and return the payload of its response.
+
+        Unread input is dropped first; stale responses to earlier
+        fire-and-forget sends that arrive late are skipped.
+        """
+        with self.lock:
+            self.ser.reset_input_buffer()
+            self.send(command, data)
+            for _ in range(4):
+                code, payload = self.read()
+                if code is None or code == command:
+                    return payload
+                print(f"[Ошибка] Неожиданный код ответа: {code}")
+            return None
+
+
+def unpack(fmt: str, data: Optional[bytes]):
+    """struct.unpack that returns None for short/missing payloads."""
+    if data is None or len(data) < struct.calcsize(fmt):
+        return None
+    return struct.unpack_from(fmt, data)
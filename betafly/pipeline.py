@@ -0,0 +1,288 @@
+"""Multiprocess acquisition over a shared-memory frame ring.
+
+The reader process does serial I/O and framing only and pushes raw frames
+into a ``multiprocessing.shared_memory`` ring. Workers (decoders, loggers,
+analytics) attach to the same ring by name and copy frames out by sequence
+number, so no frame is ever pickled and a slow worker only drops its own
+frames instead of stalling acquisition.
+"""
+import multiprocessing as mp
+import struct
+import sys
+import time
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional, Tuple
+
+# Заголовок кольца: head (число записанных кадров), capacity, slot_size
+RING_HEADER = struct.Struct('<QII')
+RING_HEADER_SIZE = 64
+# Заголовок слота: seq, timestamp, kind, code, length
+SLOT_HEADER = struct.Struct('<QdBBH4x')
+MAX_PAYLOAD = 264  # MSP v1 ≤ 255 + запас, CRSF ≤ 64
+SLOT_SIZE = SLOT_HEADER.size + MAX_PAYLOAD
+
+KIND_MSP = 0
+KIND_CRSF = 1
+
+Frame = Tuple[int, float, int, int, bytes]  # seq, timestamp, kind, code, payload
+
+
+class FrameRing:
+    """Single-producer, multi-consumer ring of raw frames in shared memory.
+
+    Each slot is guarded by its sequence number (seqlock style): the writer
+    zeroes it, writes the frame, then publishes the sequence; readers accept
+    a slot only if the sequence matches before and after copying.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        self.buf = shm.buf
+        _, self.capacity, self.slot_size = RING_HEADER.unpack_from(self.buf, 0)
+        self.oversized = 0  # кадры длиннее слота, которые push() отказался писать
+
+    @classmethod
+    def create(cls, capacity: int = 4096, name: Optional[str] = None) -> 'FrameRing':
+        shm = shared_memory.SharedMemory(name=name, create=True,
+                                         size=RING_HEADER_SIZE + capacity * SLOT_SIZE)
+        shm.buf[:RING_HEADER_SIZE + capacity * SLOT_SIZE] = bytes(RING_HEADER_SIZE + capacity * SLOT_SIZE)
+        RING_HEADER.pack_into(shm.buf, 0, 0, capacity, SLOT_SIZE)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> 'FrameRing':
+        # Процессы из multiprocessing делят resource_tracker с владельцем, так что
+        # сегмент удаляется ровно один раз — в close() создателя кольца
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def head(self) -> int:
+        return struct.unpack_from('<Q', self.buf, 0)[0]
+
+    def push(self, kind: int, code: int, payload: bytes, timestamp: Optional[float] = None) -> bool:
+        """Append a frame (writer process only).
+
+        Payloads that do not fit a slot (e.g. MSP jumbo frames) are refused
+        rather than truncated: returns False and counts them in ``oversized``.
+        """
+        length = len(payload)
+        if length > self.slot_size - SLOT_HEADER.size:
+            self.oversized += 1
+            return False
+        seq = self.head + 1
+        offset = RING_HEADER_SIZE + ((seq - 1) % self.capacity) * self.slot_size
+        ts = time.monotonic() if timestamp is None else timestamp
+        struct.pack_into('<Q', self.buf, offset, 0)
+        SLOT_HEADER.pack_into(self.buf, offset, 0, ts, kind, code, length)
+        start = offset + SLOT_HEADER.size
+        self.buf[start:start + length] = payload
+        struct.pack_into('<Q', self.buf, offset, seq)
+        struct.pack_into('<Q', self.buf, 0, seq)
+        return True
+
+    def reader(self, from_start: bool = False) -> 'RingReader':
+        return RingReader(self, 1 if from_start else self.head + 1)
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class RingReader:
+    """Independent cursor into a FrameRing; counts frames it fell behind on."""
+
+    def __init__(self, ring: FrameRing, next_seq: int):
+        self.ring = ring
+        self.next = next_seq
+        self.dropped = 0
+
+    def poll(self, limit: int = 1024) -> List[Frame]:
+        ring = self.ring
+        buf = ring.buf
+        head = ring.head
+        if head - self.next + 1 > ring.capacity:
+            skip_to = head - ring.capacity + 1
+            self.dropped += skip_to - self.next
+            self.next = skip_to
+        frames = []
+        while self.next <= head and len(frames) < limit:
+            seq = self.next
+            offset = RING_HEADER_SIZE + ((seq - 1) % ring.capacity) * ring.slot_size
+            slot_seq, ts, kind, code, length = SLOT_HEADER.unpack_from(buf, offset)
+            start = offset + SLOT_HEADER.size
+            payload = bytes(buf[start:start + length])
+            if slot_seq != seq or struct.unpack_from('<Q', buf, offset)[0] != seq:
+                # Слот перезаписан писателем, пока мы читали
+                self.dropped += 1
+            else:
+                frames.append((seq, ts, kind, code, payload))
+            self.next += 1
+        return frames
+
+
+# ====== Процессы ======
+
+def _report_oversized(name: str, ring: FrameRing):
+    if ring.oversized:
+        print(f"[pipeline] {name}: отброшено кадров длиннее {MAX_PAYLOAD} байт: {ring.oversized}")
+
+
+def msp_reader(ring_name: str, port: str, baudrate: int, commands, freq: float, stop):
+    """Poll ``commands`` at ``freq`` Hz and push every response into the ring."""
+    from .msp import MSPClient
+
+    ring = FrameRing.attach(ring_name)
+    period = 1.0 / freq
+    try:
+        with MSPClient(port, baudrate) as client:
+            while not stop.is_set():
+                start = time.monotonic()
+                for command in commands:
+                    payload = client.request(command)
+                    if payload is not None:
+                        ring.push(KIND_MSP, command, payload)
+                stop.wait(max(0.0, period - (time.monotonic() - start)))
+    finally:
+        _report_oversized('msp_reader', ring)
+        ring.close()
+
+
+def crsf_reader(ring_name: str, port: str, baudrate: int, stop):
+    """Push every CRC-valid CRSF frame (type byte as code) into the ring."""
+    from .crsf import AlfredoCRSF
+
+    ring = FrameRing.attach(ring_name)
+    crsf = AlfredoCRSF(port, baudrate)
+    try:
+        while not stop.is_set():
+            now = time.monotonic()
+            for packet in crsf.read_frames():
+                ring.push(KIND_CRSF, packet[2], packet[3:-1], now)
+            time.sleep(0.001)
+    finally:
+        _report_oversized('crsf_reader', ring)
+        crsf.close()
+        ring.close()
+
+
+def worker(ring_name: str, handler: Callable, stop, poll_interval: float = 0.005):
+    """Consume frames; ``handler(frame)`` is called in this process."""
+    ring = FrameRing.attach(ring_name)
+    reader = ring.reader(from_start=True)
+    try:
+        while not stop.is_set():
+            frames = reader.poll()
+            for frame in frames:
+                handler(frame)
+            if not frames:
+                time.sleep(poll_interval)
+    finally:
+        if reader.dropped:
+            print(f"[pipeline] {getattr(handler, '__name__', type(handler).__name__)}: пропущено кадров: {reader.dropped}")
+        if hasattr(handler, 'close'):
+            handler.close()
+        ring.close()
+
+
+# ====== Обработчики ======
+
+class FrameLogger:
+    """Append frames to a binary log: SLOT_HEADER followed by the payload."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = None
+
+    def __call__(self, frame: Frame):
+        if self.file is None:
+            self.file = open(self.path, 'ab')
+        seq, ts, kind, code, payload = frame
+        self.file.write(SLOT_HEADER.pack(seq, ts, kind, code, len(payload)) + payload)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+def read_log(path: str) -> List[Frame]:
+    """Load a FrameLogger file back into frames."""
+    frames = []
+    with open(path, 'rb') as f:
+        data = f.read()
+    offset = 0
+    while offset + SLOT_HEADER.size <= len(data):
+        seq, ts, kind, code, length = SLOT_HEADER.unpack_from(data, offset)
+        offset += SLOT_HEADER.size
+        frames.append((seq, ts, kind, code, data[offset:offset + length]))
+        offset += length
+    return frames
+
+
+def print_frame(frame: Frame):
+    """Decode attitude/altitude/RC frames and print them."""
+    from .msp import MSP_ALTITUDE, MSP_ATTITUDE, unpack
+
+    seq, ts, kind, code, payload = frame
+    if kind == KIND_MSP and code == MSP_ATTITUDE:
+        values = unpack('<hhh', payload)
+        if values:
+            print(f"[{seq}] Roll: {values[0] / 10.0:6.1f}, Pitch: {values[1] / 10.0:6.1f}, Yaw: {values[2]:6.1f}")
+    elif kind == KIND_MSP and code == MSP_ALTITUDE:
+        values = unpack('<ih', payload)
+        if values:
+            print(f"[{seq}] alt: {values[0] / 100.0:.2f} м, vario: {values[1] / 100.0:+.2f} м/с")
+    elif kind == KIND_CRSF:
+        print(f"[{seq}] CRSF 0x{code:02X}: {payload.hex()}")
+
+
+class Pipeline:
+    """Reader process plus worker processes sharing one FrameRing."""
+
+    def __init__(self, source: Callable, source_args: tuple, handlers, capacity: int = 4096):
+        self.source = source
+        self.source_args = source_args
+        self.handlers = list(handlers)
+        self.capacity = capacity
+        self.ring: Optional[FrameRing] = None
+        self.processes: List[mp.Process] = []
+        self.stop_event = mp.Event()
+
+    def start(self):
+        self.ring = FrameRing.create(self.capacity)
+        name = self.ring.name
+        # Сначала потребители, чтобы они не пропустили первые кадры
+        for handler in self.handlers:
+            self.processes.append(mp.Process(target=worker, args=(name, handler, self.stop_event), daemon=True))
+        self.processes.append(mp.Process(target=self.source, args=(name,) + self.source_args + (self.stop_event,),
+                                         daemon=True))
+        for p in self.processes:
+            p.start()
+        return self
+
+    def stop(self, timeout: float = 2.0):
+        self.stop_event.set()
+        for p in self.processes:
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+        self.processes = []
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
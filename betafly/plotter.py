@@ -0,0 +1,156 @@
+"""Live telemetry plots with streaming decimation.
+
+Acquisition calls ``LivePlotter.add()``, which costs one lock and an O(1)
+min/max bucket update, so raw 200-500 Hz streams never reach the plotting
+frontend. ``run()`` redraws the decimated envelopes at a capped frame rate;
+GUI toolkits want the main thread, so callers move acquisition to a worker
+thread (see ``run_with``). matplotlib is only imported by ``run()``.
+"""
+import math
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple
+
+EMPTY = -(1 << 62)  # номер корзины, которого не бывает
+
+
+class MinMaxDecimator:
+    """Min/max per pixel column over a sliding time window.
+
+    Memory is fixed at ``pixels`` buckets; a sample either updates its
+    bucket or recycles the slot of a bucket that scrolled out of the window.
+    """
+
+    def __init__(self, window: float = 10.0, pixels: int = 800):
+        self.pixels = pixels
+        self.bucket = window / pixels
+        self.ids = array('q', [EMPTY] * pixels)
+        self.mins = array('d', [0.0] * pixels)
+        self.maxs = array('d', [0.0] * pixels)
+        self.last = EMPTY
+
+    def add(self, t: float, value: float):
+        k = int(t / self.bucket)
+        i = k % self.pixels
+        if self.ids[i] != k:
+            self.ids[i] = k
+            self.mins[i] = self.maxs[i] = value
+        elif value < self.mins[i]:
+            self.mins[i] = value
+        elif value > self.maxs[i]:
+            self.maxs[i] = value
+        if k > self.last:
+            self.last = k
+
+    def envelope(self) -> Tuple[List[float], List[float]]:
+        """x/y for a polyline visiting min and max of every column in order."""
+        xs, ys = [], []
+        first = self.last - self.pixels + 1
+        for k in range(first, self.last + 1):
+            i = k % self.pixels
+            if self.ids[i] != k:
+                continue
+            x = k * self.bucket
+            xs += (x, x)
+            ys += (self.mins[i], self.maxs[i])
+        return xs, ys
+
+
+def lttb(x, y, n_out: int):
+    """Largest-Triangle-Three-Buckets downsampling of recorded arrays."""
+    import numpy as np
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for j in range(n_out - 2):
+        lo, hi = edges[j], edges[j + 1]
+        nxt_lo, nxt_hi = hi, edges[j + 2] if j + 2 < len(edges) else n
+        cx, cy = x[nxt_lo:nxt_hi].mean(), y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        out[j + 1] = a
+    return x[out], y[out]
+
+
+class LivePlotter:
+    def __init__(self, window: float = 10.0, pixels: int = 800, fps: float = 20.0):
+        self.window = window
+        self.pixels = pixels
+        self.fps = fps
+        self.lock = threading.Lock()
+        self.groups: Dict[str, List[str]] = OrderedDict()
+        self.traces: Dict[str, MinMaxDecimator] = {}
+        self.stopped = threading.Event()
+
+    def add(self, name: str, t: float, value: float, group: str = 'default'):
+        """Feed one sample; safe to call from the acquisition thread."""
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return
+        with self.lock:
+            trace = self.traces.get(name)
+            if trace is None:
+                trace = self.traces[name] = MinMaxDecimator(self.window, self.pixels)
+                self.groups.setdefault(group, []).append(name)
+            trace.add(t, value)
+
+    def snapshot(self) -> Dict[str, Tuple[List[float], List[float]]]:
+        with self.lock:
+            return {name: trace.envelope() for name, trace in self.traces.items()}
+
+    def run(self):
+        """Redraw at most ``fps`` times per second until the window closes."""
+        import matplotlib.pyplot as plt
+
+        plt.ion()
+        fig = plt.figure()
+        axes, lines, layout = {}, {}, ()
+        period = 1.0 / self.fps
+        while not self.stopped.is_set() and plt.fignum_exists(fig.number):
+            start = time.monotonic()
+            with self.lock:
+                groups = tuple((g, tuple(names)) for g, names in self.groups.items())
+            if groups != layout:
+                # Появились новые трассы — пересобираем оси
+                fig.clf()
+                axes, lines, layout = {}, {}, groups
+                for row, (group, names) in enumerate(groups):
+                    ax = axes[group] = fig.add_subplot(len(groups), 1, row + 1)
+                    ax.set_title(group, fontsize='small')
+                    for name in names:
+                        lines[name], = ax.plot([], [], linewidth=0.8, label=name)
+                    ax.legend(loc='upper left', fontsize='x-small')
+            for name, (xs, ys) in self.snapshot().items():
+                if name in lines:
+                    lines[name].set_data(xs, ys)
+            for ax in axes.values():
+                ax.relim()
+                ax.autoscale_view()
+            fig.canvas.draw_idle()
+            plt.pause(max(0.001, period - (time.monotonic() - start)))
+        self.stopped.set()
+
+    def run_with(self, acquire: Callable, *args, join_timeout: float = 2.0, **kwargs):
+        """Run ``acquire(*args, **kwargs)`` on a daemon thread and plot here.
+
+        ``acquire`` should return once ``stopped`` is set; it is joined
+        (up to ``join_timeout``) so the caller can close its port safely.
+        """
+        thread = threading.Thread(target=acquire, args=args, kwargs=kwargs, daemon=True)
+        thread.start()
+        try:
+            self.run()
+        except KeyboardInterrupt:
+            pass
+        self.stopped.set()
+        thread.join(join_timeout)
+        if thread.is_alive():
+            print("[plot] Поток сбора данных не остановился вовремя")
@@ -0,0 +1,82 @@
+import time
+from array import array
+from collections import Counter
+from typing import Dict, Optional
+
+# Фазы одного цикла опроса
+PHASES = ('write', 'wait', 'read', 'checksum', 'decode', 'output', 'sleep')
+
+
+class CycleProfiler:
+    """Per-phase timing of the acquisition loop.
+
+    Call ``start_cycle()`` at the top of the loop, ``mark(phase)`` right after
+    each phase finishes (time since the previous mark is charged to it) and
+    ``end_cycle(overrun)`` once per cycle. Timings live in a preallocated ring
+    buffer, so recording costs one clock read and one array add.
+    """
+
+    def __init__(self, capacity: int = 1024, report_every: float = 5.0, phases=PHASES):
+        self.phases = tuple(phases)
+        self.index = {name: i for i, name in enumerate(self.phases)}
+        self.capacity = capacity
+        self.report_every = report_every
+        self.samples = array('d', bytes(8 * capacity * len(self.phases)))
+        self.current = array('d', bytes(8 * len(self.phases)))
+        self.cycles = 0
+        self.overruns = Counter()
+        self.last = time.perf_counter()
+        self.last_report = time.monotonic()
+
+    def start_cycle(self):
+        for i in range(len(self.current)):
+            self.current[i] = 0.0
+        self.last = time.perf_counter()
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.current[self.index[phase]] += now - self.last
+        self.last = now
+
+    def end_cycle(self, overrun: float = 0.0):
+        """Commit the cycle; ``overrun`` > 0 blames the slowest non-sleep phase."""
+        n = len(self.phases)
+        base = (self.cycles % self.capacity) * n
+        self.samples[base:base + n] = self.current
+        self.cycles += 1
+        if overrun > 0:
+            worst = max((p for p in self.phases if p != 'sleep'),
+                        key=lambda p: self.current[self.index[p]])
+            self.overruns[worst] += 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """p50/p99/mean per phase (seconds) over the buffered cycles."""
+        n = len(self.phases)
+        count = min(self.cycles, self.capacity)
+        result = {}
+        if not count:
+            return result
+        for i, phase in enumerate(self.phases):
+            values = sorted(self.samples[i:count * n:n])
+            result[phase] = {
+                'p50': values[count // 2],
+                'p99': values[min(count - 1, int(count * 0.99))],
+                'mean': sum(values) / count,
+            }
+        return result
+
+    def report(self) -> str:
+        lines = [f"[Профиль] циклов: {self.cycles}, перегрузок: {sum(self.overruns.values())}"]
+        for phase, s in self.summary().items():
+            lines.append(f"  {phase:<9} p50 {s['p50'] * 1000:7.2f} ms  p99 {s['p99'] * 1000:7.2f} ms")
+        if self.overruns:
+            causes = ', '.join(f"{p}: {n}" for p, n in self.overruns.most_common(3))
+            lines.append(f"  Причины перегрузок: {causes}")
+        return '\n'.join(lines)
+
+    def maybe_report(self, now: Optional[float] = None):
+        """Print the summary at most once per ``report_every`` seconds."""
+        now = now if now is not None else time.monotonic()
+        if now - self.last_report >= self.report_every:
+            self.last_report = now
+            print(self.report())
@@ -0,0 +1,194 @@
+import time
+from typing import Optional
+
+from .attitude_estimator import AttitudeEstimator
+from .baro_filter import AltitudeFilter
+from .metrics import REGISTRY
+from .msp import MSP_ALTITUDE, MSP_ATTITUDE, MSP_RAW_IMU, MSPClient, unpack
+from .profiler import CycleProfiler
+
+UPDATE_FREQ = 50  # Hz
+METRICS_FILE_INTERVAL = 5.0  # с, как отчёт CycleProfiler по умолчанию
+
+# ====== Получение данных ======
+
+def get_attitude(client: MSPClient):
+    """(roll, pitch, yaw) in degrees from MSP_ATTITUDE."""
+    values = unpack('<hhh', client.request(MSP_ATTITUDE))
+    if values is None:
+        print("[Ошибка] Неверный код или данные attitude")
+        return None
+    roll, pitch, yaw = values
+    client.mark('decode')
+    return roll / 10.0, pitch / 10.0, yaw
+
+
+def get_baro_altitude(client: MSPClient):
+    """(altitude in metres, FC vertical speed in m/s) from MSP_ALTITUDE."""
+    values = unpack('<ih', client.request(MSP_ALTITUDE))
+    if values is None:
+        print("[Ошибка] Неверный код или данные baro")
+        return None
+    alt, vario = values  # int32 см, int16 см/с
+    client.mark('decode')
+    return alt / 100.0, vario / 100.0
+
+
+def get_raw_imu(client: MSPClient):
+    """All nine raw values of MSP_RAW_IMU: acc[3], gyro[3], mag[3]."""
+    # 9 int16 = 18 байт; перевод в единицы — betafly.imu.ImuCalibration
+    values = unpack('<9h', client.request(MSP_RAW_IMU))
+    if values is None:
+        print("[Ошибка] Неверный код или данные IMU")
+        return None
+    client.mark('decode')
+    return values
+
+
+def get_gyro_rates(client: MSPClient):
+    """Raw (gx, gy, gz) from MSP_RAW_IMU."""
+    values = get_raw_imu(client)
+    return values[3:6] if values else None
+
+
+# ====== Основной цикл ======
+
+def _sample_estimates(estimator: AttitudeEstimator, until: float, step: float, plotter=None):
+    """Sleep until ``until`` (monotonic), reporting ``estimator.get()`` every ``step`` s."""
+    while time.monotonic() + step < until:
+        time.sleep(step)
+        estimate = estimator.get()
+        if estimate is None:
+            continue
+        roll, pitch, yaw, t = estimate
+        if plotter:
+            for name, value in zip(('roll_est', 'pitch_est', 'yaw_est'), (roll, pitch, yaw)):
+                plotter.add(name, t, value, 'attitude')
+        else:
+            print(f"  оценка t={t:.3f}: Roll: {roll:6.1f}, Pitch: {pitch:6.1f}, Yaw: {yaw:6.1f}")
+    time.sleep(max(0.0, until - time.monotonic()))
+
+
+def _write_metrics(path: str):
+    try:
+        REGISTRY.write_prometheus(path)
+    except OSError as e:
+        print(f"[Ошибка] Не удалось записать метрики в {path}: {e}")
+
+
+def monitor(client: MSPClient, freq: float = UPDATE_FREQ, attitude_only: bool = False,
+            profile: bool = False, metrics_port=None, plotter=None, calibration=None,
+            estimator: Optional[AttitudeEstimator] = None, estimate_rate: float = 0.0,
+            metrics_file: Optional[str] = None):
+    """Poll attitude/baro/IMU at ``freq`` Hz and print them (and plot, if given).
+
+    With an ``ImuCalibration`` the full RAW_IMU sample is converted and
+    acc/mag are printed too; the estimator then gets calibrated gyro rates.
+    Pass an ``estimator`` to read ``estimator.get()`` from another thread;
+    with ``estimate_rate`` the loop itself prints (or plots) the
+    extrapolated attitude at that rate between polls. ``metrics_file`` is
+    rewritten every METRICS_FILE_INTERVAL seconds for node_exporter.
+    """
+    period = 1.0 / freq
+    profiler = client.profiler = CycleProfiler() if profile else None
+    # Оценка ориентации между опросами; estimator.get() — без обмена по порту
+    estimator = estimator or AttitudeEstimator()
+    alt_filter = AltitudeFilter()
+    metrics_written = time.monotonic()
+
+    try:
+        if metrics_port:
+            try:
+                REGISTRY.serve_prometheus(metrics_port)
+            except OSError as e:
+                # Порт занят — мониторинг продолжаем без HTTP-метрик
+                print(f"[Ошибка] Не удалось открыть порт метрик {metrics_port}: {e}")
+        print("Начинаем мониторинг данных...")
+
+        while not (plotter and plotter.stopped.is_set()):
+            start_time = time.monotonic()
+            if profiler:
+                profiler.start_cycle()
+
+            # Получение данных с сенсоров
+            attitude = get_attitude(client)
+            altitude_data = None if attitude_only else get_baro_altitude(client)
+            imu = None if attitude_only else get_raw_imu(client)
+            gyro_rates = imu[3:6] if imu else None
+            if imu and calibration is not None:
+                imu = calibration.apply(imu).tolist()
+                gyro_rates = imu[3:6]
+
+            if gyro_rates:
+                estimator.update_gyro(gyro_rates)
+            if attitude:
+                estimator.update_attitude(attitude)
+
+            # Вывод данных
+            if attitude:
+                roll, pitch, yaw = attitude
+                print(f"Roll: {roll:6.1f}, Pitch: {pitch:6.1f}, Yaw: {yaw:6.1f}")
+            else:
+                print("[!] Ошибка получения данных attitude")
+
+            if not attitude_only:
+                if altitude_data:
+                    altitude, vario = altitude_data
+                    alt_f, vz = alt_filter.update(altitude, vario)
+                    print(f"alt: {altitude:.2f} м, vario: {vario:+.2f} м/с, фильтр: {alt_f:.2f} м, vz: {vz:+.2f} м/с")
+                else:
+                    print("[!] Ошибка получения данных baro")
+
+                if gyro_rates and calibration is not None:
+                    print("Acc: X: {:6.3f}, Y: {:6.3f}, Z: {:6.3f} g".format(*imu[0:3]))
+                    print("Gyro: X: {:7.1f}, Y: {:7.1f}, Z: {:7.1f} град/с".format(*gyro_rates))
+                    print("Mag: X: {:7.1f}, Y: {:7.1f}, Z: {:7.1f}".format(*imu[6:9]))
+                elif gyro_rates:
+                    gx, gy, gz = gyro_rates
+                    print(f"Gyro: X: {gx:5d}, Y: {gy:5d}, Z: {gz:5d}")
+                else:
+                    print("[!] Ошибка получения данных gyro")
+
+            if plotter:
+                if attitude:
+                    for name, value in zip(('roll', 'pitch', 'yaw'), attitude):
+                        plotter.add(name, start_time, value, 'attitude')
+                if altitude_data:
+                    plotter.add('alt', start_time, altitude_data[0], 'altitude')
+                    plotter.add('alt_filtered', start_time, alt_f, 'altitude')
+                    plotter.add('vz', start_time, vz, 'vertical speed')
+                if gyro_rates:
+                    for name, value in zip(('gx', 'gy', 'gz'), gyro_rates):
+                        plotter.add(name, start_time, value, 'gyro')
+                if imu and calibration is not None:
+                    for name, value in zip(('ax', 'ay', 'az'), imu[0:3]):
+                        plotter.add(name, start_time, value, 'acc')
+
+            client.mark('output')
+
+            # Поддержание частоты обновления
+            elapsed = time.monotonic() - start_time
+            sleep_time = period - elapsed
+
+            if sleep_time > 0 and estimate_rate > 0:
+                _sample_estimates(estimator, start_time + period, 1.0 / estimate_rate, plotter)
+            elif sleep_time > 0:
+                time.sleep(sleep_time)
+            else:
+                print(f"Задержка обновления: {-sleep_time:.3f}s")
+
+            if profiler:
+                profiler.mark('sleep')
+                profiler.end_cycle(overrun=-sleep_time)
+                profiler.maybe_report()
+
+            if metrics_file and start_time - metrics_written >= METRICS_FILE_INTERVAL:
+                _write_metrics(metrics_file)
+                metrics_written = start_time
+
+    except KeyboardInterrupt:
+        print("\nОстановка")
+        print(f"Метрики MSP: {client.link.snapshot()}")
+    finally:
+        if metrics_file:
+            _write_metrics(metrics_file)
@@ -0,0 +1,260 @@
+"""Settings snapshot, diff and restore over MSP.
+
+A snapshot is the raw payload of each configuration message, keyed by name,
+plus a format version. Diffs are computed per field using the layouts in
+``SETTINGS``; restore only sends messages (or mode ranges) whose fields
+differ. Requests are pipelined: every request is written before the first
+response is awaited.
+"""
+import json
+import struct
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .msp import (MSP_API_VERSION, MSP_BOXIDS, MSP_EEPROM_WRITE, MSP_FEATURE_CONFIG, MSP_MODE_RANGES,
+                  MSP_PID, MSP_RC_TUNING, MSP_RX_CONFIG, MSP_RX_MAP, MSP_SET_FEATURE_CONFIG,
+                  MSP_SET_MODE_RANGE, MSP_SET_PID, MSP_SET_RC_TUNING, MSP_SET_RX_CONFIG, MSP_SET_RX_MAP)
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MAGIC = b'BFSS'
+
+PID_NAMES = ('ROLL', 'PITCH', 'YAW', 'LEVEL', 'MAG')
+
+# Раскладки Betaflight (API 1.41+); поля новых версий идут в конец
+RC_TUNING_LAYOUT = '<BBBBBBBBHBBBBBBHHHB'
+RC_TUNING_NAMES = ('rc_rate', 'rc_expo', 'roll_rate', 'pitch_rate', 'yaw_rate', 'tpa_rate',
+                   'throttle_mid', 'throttle_expo', 'tpa_breakpoint', 'rc_yaw_expo', 'rc_yaw_rate',
+                   'rc_pitch_rate', 'rc_pitch_expo', 'throttle_limit_type', 'throttle_limit_percent',
+                   'roll_rate_limit', 'pitch_rate_limit', 'yaw_rate_limit', 'rates_type')
+RX_CONFIG_LAYOUT = '<BHHHBHHBBHBIBBBBBBBBBBB'
+RX_CONFIG_NAMES = ('serialrx_provider', 'maxcheck', 'midrc', 'mincheck', 'spektrum_sat_bind',
+                   'rx_min_usec', 'rx_max_usec', 'rc_interpolation', 'rc_interpolation_interval',
+                   'airmode_activate_threshold', 'rx_spi_protocol', 'rx_spi_id', 'rx_spi_rf_channel_count',
+                   'fpv_cam_angle', 'rc_interpolation_channels', 'rc_smoothing_type',
+                   'rc_smoothing_input_cutoff', 'rc_smoothing_derivative_cutoff', 'rc_smoothing_input_type',
+                   'rc_smoothing_derivative_type', 'usb_cdc_hid_type', 'rc_smoothing_auto_factor',
+                   'rc_smoothing_mode')
+
+
+class Setting:
+    """One configuration message: how to fetch, name fields and push it.
+
+    ``record`` is a struct format repeated over the payload and ``names``
+    labels its items; without ``record`` every byte is its own field. With
+    ``repeat=False`` the record is one flat layout: fields are decoded while
+    they fit (older API versions send fewer) and bytes past the layout
+    (newer versions append fields) are listed by offset.
+    """
+
+    def __init__(self, name: str, get: int, set: Optional[int] = None,
+                 record: Optional[str] = None, names=(), labels=None, repeat: bool = True):
+        self.name = name
+        self.get = get
+        self.set = set
+        self.record = struct.Struct(record) if record else None
+        self.names = names
+        self.labels = labels
+        self.repeat = repeat
+
+    def fields(self, payload: bytes) -> Dict[str, int]:
+        if self.record is None:
+            return {f'[{i}]': b for i, b in enumerate(payload)}
+        if not self.repeat:
+            return self._flat_fields(payload)
+        result = {}
+        size = self.record.size
+        for i in range(len(payload) // size):
+            values = self.record.unpack_from(payload, i * size)
+            prefix = self.labels[i] if self.labels and i < len(self.labels) else f'[{i}]'
+            for name, value in zip(self.names, values):
+                result[f'{prefix}.{name}' if name else prefix] = value
+        return result
+
+    def _flat_fields(self, payload: bytes) -> Dict[str, int]:
+        order, codes = self.record.format[0], self.record.format[1:]
+        count = len(codes)
+        while count and struct.calcsize(order + codes[:count]) > len(payload):
+            count -= 1
+        layout = struct.Struct(order + codes[:count])
+        result = dict(zip(self.names, layout.unpack_from(payload)))
+        result.update({f'[{i}]': payload[i] for i in range(layout.size, len(payload))})
+        return result
+
+
+SETTINGS = (
+    Setting('api_version', MSP_API_VERSION, record='<BBB', names=('protocol', 'major', 'minor'), repeat=False),
+    Setting('pid', MSP_PID, MSP_SET_PID, '<BBB', ('P', 'I', 'D'), PID_NAMES),
+    Setting('rc_tuning', MSP_RC_TUNING, MSP_SET_RC_TUNING, RC_TUNING_LAYOUT, RC_TUNING_NAMES, repeat=False),
+    Setting('mode_ranges', MSP_MODE_RANGES, MSP_SET_MODE_RANGE, '<BBBB', ('box', 'aux', 'start', 'end')),
+    Setting('rx_config', MSP_RX_CONFIG, MSP_SET_RX_CONFIG, RX_CONFIG_LAYOUT, RX_CONFIG_NAMES, repeat=False),
+    Setting('rx_map', MSP_RX_MAP, MSP_SET_RX_MAP),
+    Setting('features', MSP_FEATURE_CONFIG, MSP_SET_FEATURE_CONFIG, '<I', ('',), ('mask',)),
+    Setting('box_ids', MSP_BOXIDS),
+)
+SETTINGS_BY_NAME = {s.name: s for s in SETTINGS}
+SETTINGS_BY_CODE = {s.get: s for s in SETTINGS}
+
+
+def pipelined(client, requests: List[Tuple[int, bytes]], timeout: float = 1.0) -> Dict[int, Optional[bytes]]:
+    """Write every request, then collect responses by command code."""
+    results: Dict[int, Optional[bytes]] = {}
+    with client.lock:
+        for command, data in requests:
+            client.send(command, data)
+        pending = {command for command, _ in requests}
+        deadline = time.monotonic() + timeout
+        while pending and time.monotonic() < deadline:
+            code, payload = client.read()
+            if code in pending:
+                pending.discard(code)
+                results[code] = payload
+    return results
+
+
+class Snapshot:
+    def __init__(self, messages: Dict[str, bytes], version: int = SNAPSHOT_VERSION):
+        self.version = version
+        self.messages = messages
+
+    @classmethod
+    def fetch(cls, client, names=None) -> 'Snapshot':
+        if names and 'api_version' not in names:
+            names = ['api_version', *names]  # версия нужна restore() для проверки совместимости
+        settings = [SETTINGS_BY_NAME[n] for n in names] if names else SETTINGS
+        responses = pipelined(client, [(s.get, b'') for s in settings])
+        messages = {s.name: responses[s.get] for s in settings if responses.get(s.get) is not None}
+        missing = [s.name for s in settings if s.name not in messages]
+        if missing:
+            print(f"[settings] Нет ответа на: {', '.join(missing)}")
+        return cls(messages)
+
+    def fields(self) -> Dict[str, Dict[str, int]]:
+        return {name: SETTINGS_BY_NAME[name].fields(payload) for name, payload in self.messages.items()}
+
+    # ====== Хранение ======
+
+    def to_bytes(self) -> bytes:
+        out = bytearray(SNAPSHOT_MAGIC + struct.pack('<BB', self.version, len(self.messages)))
+        for name, payload in self.messages.items():
+            out += struct.pack('<BH', SETTINGS_BY_NAME[name].get, len(payload)) + payload
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Snapshot':
+        if data[:4] != SNAPSHOT_MAGIC:
+            raise ValueError("Не снимок настроек")
+        version, count = struct.unpack_from('<BB', data, 4)
+        if version > SNAPSHOT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия снимка: {version}")
+        offset = 6
+        messages = {}
+        for _ in range(count):
+            code, length = struct.unpack_from('<BH', data, offset)
+            offset += 3
+            messages[SETTINGS_BY_CODE[code].name] = data[offset:offset + length]
+            offset += length
+        return cls(messages, version)
+
+    def to_json(self) -> str:
+        return json.dumps({'version': self.version,
+                           'messages': {n: p.hex() for n, p in self.messages.items()},
+                           'fields': self.fields()}, indent=1)
+
+    @classmethod
+    def from_json(cls, text: str) -> 'Snapshot':
+        doc = json.loads(text)
+        if doc['version'] > SNAPSHOT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия снимка: {doc['version']}")
+        return cls({n: bytes.fromhex(p) for n, p in doc['messages'].items()}, doc['version'])
+
+    def save(self, path: str):
+        """``.json`` — readable JSON with decoded fields, otherwise compact binary."""
+        if path.endswith('.json'):
+            with open(path, 'w') as f:
+                f.write(self.to_json())
+        else:
+            with open(path, 'wb') as f:
+                f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> 'Snapshot':
+        with open(path, 'rb') as f:
+            data = f.read()
+        return cls.from_bytes(data) if data[:4] == SNAPSHOT_MAGIC else cls.from_json(data.decode())
+
+
+def diff(current: Snapshot, target: Snapshot) -> Dict[str, Dict[str, Tuple]]:
+    """Per message, fields whose value differs: {field: (current, target)}."""
+    result = {}
+    cur_fields, tgt_fields = current.fields(), target.fields()
+    for name, tgt in tgt_fields.items():
+        cur = cur_fields.get(name, {})
+        changed = {k: (cur.get(k), v) for k, v in tgt.items() if cur.get(k) != v}
+        changed.update({k: (v, None) for k, v in cur.items() if k not in tgt})
+        if changed:
+            result[name] = changed
+    return result
+
+
+def restore_requests(current: Snapshot, target: Snapshot) -> List[Tuple[int, bytes]]:
+    """Set-messages needed to turn ``current`` into ``target``."""
+    requests = []
+    for name in diff(current, target):
+        setting = SETTINGS_BY_NAME[name]
+        if setting.set is None:
+            continue  # только чтение (версия API, box ids)
+        payload = target.messages[name]
+        if setting.set == MSP_SET_MODE_RANGE:
+            # Диапазоны режимов пишутся по одному: index, box, aux, start, end
+            old = current.messages.get(name, b'')
+            size = setting.record.size
+            for i in range(len(payload) // size):
+                chunk = payload[i * size:(i + 1) * size]
+                if old[i * size:(i + 1) * size] != chunk:
+                    requests.append((setting.set, bytes((i,)) + chunk))
+        else:
+            requests.append((setting.set, payload))
+    return requests
+
+
+def api_version(snapshot: Snapshot) -> Optional[Tuple[int, int]]:
+    """(major, minor) of the MSP API the snapshot was taken from."""
+    payload = snapshot.messages.get('api_version')
+    if payload is None or len(payload) < 3:
+        return None
+    return payload[1], payload[2]
+
+
+def restore(client, target: Snapshot, save: bool = True, force: bool = False) -> int:
+    """Push only changed settings; returns the number of messages sent.
+
+    Raw SET payloads are only valid for the API version they were read
+    from, so a snapshot from another (or unknown) version is refused with
+    ``ValueError`` unless ``force`` is set.
+    """
+    current = Snapshot.fetch(client, list(target.messages))
+    have, want = api_version(current), api_version(target)
+    if have is None or want is None or have != want:
+        names = ['.'.join(map(str, v)) if v else 'неизвестна' for v in (want, have)]
+        message = f"Версия API снимка {names[0]}, контроллера {names[1]}"
+        if not force:
+            raise ValueError(message + " — восстановление отменено (--force, чтобы записать всё равно)")
+        print(f"[settings] {message}, записываем принудительно")
+    requests = restore_requests(current, target)
+    if not requests:
+        return 0
+    # Ответы на SET-команды с одинаковым кодом (диапазоны режимов) считаем по количеству
+    with client.lock:
+        for command, data in requests:
+            client.send(command, data)
+        acked = 0
+        deadline = time.monotonic() + 1.0
+        while acked < len(requests) and time.monotonic() < deadline:
+            code, _ = client.read()
+            if code is not None:
+                acked += 1
+    if acked < len(requests):
+        print(f"[settings] Подтверждено {acked} из {len(requests)} сообщений")
+    if save:
+        client.request(MSP_EEPROM_WRITE)
+    return len(requests)
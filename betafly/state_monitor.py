@@ -0,0 +1,125 @@
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from .msp import MSP_STATUS, MSP_STATUS_EX, MSPClient, unpack
+
+ARMED = 1 << 0  # бит 0 слова флагов MSP_STATUS
+
+
+class StateMonitor:
+    """Change-driven view of the MSP_STATUS flag word.
+
+    Polls fast for ``fast_window`` seconds after ``expect_change()`` or an
+    observed transition and slowly otherwise. Subscribers are only called
+    when a bit in their mask flips: ``callback(old, new, changed, timestamp)``.
+    """
+
+    def __init__(self, client: MSPClient, fast_interval: float = 0.02,
+                 slow_interval: float = 0.5, fast_window: float = 2.0,
+                 extended: bool = False):
+        self.client = client
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self.fast_window = fast_window
+        self.extended = extended  # MSP_STATUS_EX: ещё и флаги запрета арминга
+        self.flags: Optional[int] = None
+        self.arming_disable_flags: Optional[int] = None
+        self.timestamp: Optional[float] = None
+        self.subscribers: List[Tuple[int, Callable]] = []
+        self.fast_until = 0.0
+        self.changed = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def subscribe(self, callback: Callable, mask: int = 0xFFFFFFFF):
+        self.subscribers.append((mask, callback))
+        return callback
+
+    def unsubscribe(self, callback: Callable):
+        self.subscribers = [(m, cb) for m, cb in self.subscribers if cb is not callback]
+
+    def expect_change(self, duration: Optional[float] = None):
+        """Switch to the fast poll rate, e.g. right before arming."""
+        self.fast_until = time.monotonic() + (self.fast_window if duration is None else duration)
+
+    def _read(self) -> Optional[int]:
+        if not self.extended:
+            values = unpack('<HHHI', self.client.request(MSP_STATUS))
+            return None if values is None else values[3]
+        data = self.client.request(MSP_STATUS_EX)
+        values = unpack('<HHHIBHBBB', data)
+        if values is None:
+            return None
+        # После счётчика дополнительных байтов режимов: count(u8), armingDisableFlags(u32)
+        offset = 16 + values[8]
+        extra = unpack('<BI', data[offset:])
+        if extra is not None:
+            self.arming_disable_flags = extra[1]
+        return values[3]
+
+    def poll(self) -> Optional[int]:
+        """Poll once, notify subscribers on transitions; returns the flag word."""
+        flags = self._read()
+        now = time.monotonic()
+        if flags is None:
+            return None
+        old = self.flags
+        with self.changed:
+            self.flags = flags
+            self.timestamp = now
+            self.changed.notify_all()
+        if old is None:
+            return flags
+        diff = old ^ flags
+        if diff:
+            self.fast_until = now + self.fast_window
+            for mask, callback in list(self.subscribers):
+                if diff & mask:
+                    callback(old, flags, diff & mask, now)
+        return flags
+
+    def interval(self) -> float:
+        return self.fast_interval if time.monotonic() < self.fast_until else self.slow_interval
+
+    def _run(self):
+        while not self._stop.is_set():
+            start = time.monotonic()
+            self.poll()
+            self._stop.wait(max(0.0, self.interval() - (time.monotonic() - start)))
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def wait_for(self, mask: int, value: Optional[int] = None, timeout: float = 1.0) -> bool:
+        """Wait until ``flags & mask == value`` (default: all mask bits set).
+
+        Uses the background thread if it is running, otherwise polls inline
+        at the fast rate. Returns False on timeout.
+        """
+        value = mask if value is None else value
+        deadline = time.monotonic() + timeout
+        self.expect_change(timeout)
+        while True:
+            if self._thread is None:
+                self.poll()
+            if self.flags is not None and self.flags & mask == value:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if self._thread is None:
+                time.sleep(min(self.fast_interval, remaining))
+            else:
+                with self.changed:
+                    self.changed.wait(remaining)
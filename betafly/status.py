@@ -0,0 +1,135 @@
+import struct
+
+from .msp import (MSP_BOX, MSP_BOXNAMES, MSP_SET_ARMING, MSP_SET_RAW_RC, MSP_STATUS,
+                  MSPClient, unpack)
+from .sensors import get_baro_altitude
+from .state_monitor import ARMED, StateMonitor
+
+# Флаги режимов MSP_STATUS (на основе Betaflight)
+FLIGHT_MODE_FLAGS = (
+    (0, "ARM"),
+    (1, "ANGLE"),
+    (2, "HORIZON"),
+    (3, "BARO"),
+    (4, "MAG"),
+    (7, "HEADFREE"),
+    (10, "GPS_HOME"),
+    (11, "GPS_HOLD"),
+)
+
+
+def get_status_flags(client: MSPClient):
+    """Packed mode flag word from MSP_STATUS, or None."""
+    # cycleTime (uint16), i2cError (uint16), sensor (uint16), flag (uint32), globalConf (uint8)
+    values = unpack('<HHHIb', client.request(MSP_STATUS))
+    return None if values is None else values[3]
+
+
+def decode_flight_modes(flag: int):
+    return [name for bit, name in FLIGHT_MODE_FLAGS if flag & (1 << bit)]
+
+
+def get_flight_mode(client: MSPClient):
+    """Print and return the active flight modes from MSP_STATUS."""
+    flag = get_status_flags(client)
+    if flag is None:
+        print("[!] Нет ответа или неверный код")
+        return None
+    modes = decode_flight_modes(flag)
+    print(f"[📡] Режимы полета: {', '.join(modes) if modes else 'Нет активных режимов'}")
+    print(f"[📊] Флаги: {bin(flag)}")
+    return modes
+
+
+def get_arm_status(client: MSPClient) -> str:
+    flag = get_status_flags(client)
+    if flag is None:
+        return "ERROR"
+    return "ARMED" if flag & 0x01 else "DISARMED"  # Бит 0 - статус арма
+
+
+def arm_disarm(client: MSPClient, arm_flag: bool, timeout: float = 0.5) -> bool:
+    """Arm/disarm with MSP_SET_ARMING and wait until the FC reports it."""
+    monitor = StateMonitor(client)
+    # request(), а не send(): подтверждение не должно достаться опросу MSP_STATUS
+    client.request(MSP_SET_ARMING, [1 if arm_flag else 0])
+    return monitor.wait_for(ARMED, ARMED if arm_flag else 0, timeout=timeout)
+
+
+def set_raw_rc(client: MSPClient, channels) -> bool:
+    """Send MSP_SET_RAW_RC with channel values in microseconds."""
+    data = struct.pack(f'<{len(channels)}H', *channels)
+    return client.request(MSP_SET_RAW_RC, data) is not None
+
+
+def set_arm(client: MSPClient, arm: bool = True) -> bool:
+    """Arm/disarm through AUX1 via MSP_SET_RAW_RC."""
+    # Каналы: roll, pitch, yaw, throttle, aux1 (arming), aux2-4
+    aux1 = 2000 if arm else 1000  # AUX1: 2000 для арминга, 1000 для дизарминга
+    if not set_raw_rc(client, [1500, 1500, 1500, 1000, aux1, 1000, 1000, 1000]):
+        print(f"[!] Ошибка {'арминга' if arm else 'дизарминга'}")
+        return False
+    print(f"[✔] Дрон {'армирован' if arm else 'дизармирован'}")
+    return True
+
+
+def set_throttle(client: MSPClient, throttle: int) -> bool:
+    if not 1000 <= throttle <= 2000:
+        print("[!] Троттл должен быть в диапазоне 1000-2000")
+        return False
+    # aux1 = 2000: предполагаем, что дрон армирован
+    if not set_raw_rc(client, [1500, 1500, 1500, throttle, 2000, 1000, 1000, 1000]):
+        print("[!] Ошибка установки троттла")
+        return False
+    print(f"[✔] Троттл установлен: {throttle}")
+    return True
+
+
+def print_baro_altitude(client: MSPClient):
+    """Print altitude and vertical speed from MSP_ALTITUDE."""
+    result = get_baro_altitude(client)
+    if result is None:
+        print("[!] Нет ответа или неверный код")
+        return None
+    alt, vario = result
+    print(f"[📡] Высота: {alt} м")
+    print(f"[📊] Вертикальная скорость: {vario:+.2f} м/с")
+    return result
+
+
+def get_boxnames(client: MSPClient):
+    data = client.request(MSP_BOXNAMES)
+    if not data:
+        return []
+    try:
+        return [n.decode('utf-8') for n in data.split(b'\x00') if n]
+    except UnicodeDecodeError as e:
+        print(f"[ERROR] Decoding error: {str(e)}")
+        return []
+
+
+def get_active_modes(client: MSPClient):
+    data = client.request(MSP_BOX)
+    if data is None:
+        return None
+    if len(data) % 4 != 0:
+        print("[ERROR] Invalid data length")
+        return None
+    return [v for (v,) in struct.iter_unpack('<I', data)]
+
+
+def print_active_modes(client: MSPClient):
+    names = get_boxnames(client)
+    if not names:
+        print("Failed to get mode names")
+        return
+
+    masks = get_active_modes(client)
+    if not masks:
+        print("Failed to get active modes")
+        return
+
+    print("\n[INFO] Active Modes:")
+    for i, name in enumerate(names[:32]):  # Ограничение по битовой маске
+        if masks[0] & (1 << i):
+            print(f" - {name}")